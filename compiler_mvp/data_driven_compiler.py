@@ -1,12 +1,13 @@
 """Data-driven compilation pipeline for ActionPlan generation."""
 from __future__ import annotations
 
-import json
 import logging
-from datetime import datetime
+import os
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .json_utils import dumps_pretty, read_json, write_json
 from .models import DataDrivenResult, DataItem, DataSet, ReplacementStats
 from .placeholder_processor import PlaceholderProcessor
 
@@ -14,6 +15,9 @@ from .placeholder_processor import PlaceholderProcessor
 
 logger = logging.getLogger(__name__)
 
+CASE_TEST_ID_FORMAT = '%s_%03d'
+CASE_DATA_SOURCE_FORMAT = 'dataset#%d'
+
 
 class DataSetLoader:
     """Handles loading and parsing of data sets."""
@@ -32,16 +36,21 @@ class DataSetLoader:
             FileNotFoundError: If the file doesn't exist.
             json.JSONDecodeError: If the file is not valid JSON.
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(Path(filepath))
 
     @staticmethod
-    def extract_category(raw_data: Dict[str, object], category: str) -> DataSet:
+    def extract_category(
+        raw_data: Dict[str, object],
+        category: str,
+        category_index: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> DataSet:
         """Extract a specific category from dataset.
 
         Args:
             raw_data: The parsed dataset JSON.
             category: The category key to extract.
+            category_index: Optional index from ``build_category_index``, reused when extracting
+                several categories from the same dataset.
 
         Returns:
             DataSet object with the extracted items.
@@ -53,14 +62,9 @@ class DataSetLoader:
         if 'data' not in raw_data or 'categories' not in raw_data['data']:
             raise ValueError('数据集格式不符合预期: 缺少 data.categories 字段')
 
-        categories = raw_data['data']['categories']
-        target_category = None
-
-        for cat in categories:
-            if cat.get('category_key') == category:
-                target_category = cat
-                break
-
+        if category_index is None:
+            category_index = DataSetLoader.build_category_index(raw_data)
+        target_category = category_index.get(category)
         if target_category is None:
             raise KeyError(f'未找到类别: {category}')
 
@@ -69,6 +73,14 @@ class DataSetLoader:
 
         return DataSet(category=category, items=items, raw=raw_data)
 
+    @staticmethod
+    def build_category_index(raw_data: Dict[str, object]) -> Dict[str, Dict[str, Any]]:
+        """Build a ``category_key -> category`` index; the first category wins on duplicate keys."""
+        index: Dict[str, Dict[str, Any]] = {}
+        for cat in raw_data['data']['categories']:
+            index.setdefault(cat.get('category_key'), cat)
+        return index
+
 
 class DataDrivenCompiler:
     """Compiles ActionPlan templates into data-driven test cases."""
@@ -101,9 +113,11 @@ class DataDrivenCompiler:
         )
 
         stats = ReplacementStats(total_items=len(dataset.items))
+        # 模板中的字符串只解析一次，每个用例按数据项直接生成新的计划对象
+        compiled_template = PlaceholderProcessor.compile_template(template_plan)
 
         for data_item in dataset.items:
-            case_plan, success = self._compile_single_case(template_plan, test_id_base, data_item.index, data_item.data, stats)
+            case_plan, success = self._compile_single_case(compiled_template, test_id_base, data_item.index, data_item.data, stats)
 
             if success:
                 result.cases.append(case_plan)
@@ -116,7 +130,7 @@ class DataDrivenCompiler:
 
     def _compile_single_case(
         self,
-        template_plan: Dict[str, object],
+        compiled_template: Any,
         test_id_base: str,
         data_index: int,
         data: Dict[str, Any],
@@ -125,7 +139,7 @@ class DataDrivenCompiler:
         """Compile a single test case from template and data item.
 
         Args:
-            template_plan: The template ActionPlan.
+            compiled_template: The template ActionPlan prepared by ``PlaceholderProcessor.compile_template``.
             test_id_base: Base test ID.
             data_index: Index of the data item.
             data: The data dictionary for this item.
@@ -134,16 +148,15 @@ class DataDrivenCompiler:
         Returns:
             Tuple of (compiled_case, success_flag).
         """
-        plan_copy = json.loads(json.dumps(template_plan))
+        replaced_plan, success = PlaceholderProcessor.apply_template(compiled_template, data, stats, data_index)
 
-        replaced_plan, success = PlaceholderProcessor.replace_placeholders_in_dict(
-            plan_copy, data, stats, data_index
-        )
+        if not success:
+            return None, False
 
-        if success and isinstance(replaced_plan, dict):
+        if isinstance(replaced_plan, dict):
             self._update_meta_info(replaced_plan, test_id_base, data_index)
 
-        return replaced_plan if success else None, success
+        return replaced_plan, True
 
     @staticmethod
     def _update_meta_info(plan: Dict[str, object], test_id_base: str, data_index: int) -> None:
@@ -154,17 +167,13 @@ class DataDrivenCompiler:
             test_id_base: Base test ID.
             data_index: Index of the data item.
         """
-        if 'meta' not in plan:
-            plan['meta'] = {}
-
-        meta = plan['meta']
+        meta = plan.get('meta')
         if not isinstance(meta, dict):
-            meta = {}
-            plan['meta'] = meta
+            meta = plan['meta'] = {}
 
-        test_id = meta.get('testId', test_id_base)
-        meta['testId'] = f'{test_id}_{data_index + 1:03d}'
-        meta['dataSource'] = f'dataset#{data_index}'
+        # testId 可能含有按数据项替换的占位符，因此仍需逐个用例读取
+        meta['testId'] = CASE_TEST_ID_FORMAT % (meta.get('testId', test_id_base), data_index + 1)
+        meta['dataSource'] = CASE_DATA_SOURCE_FORMAT % data_index
 
 
 class CompilationOutputWriter:
@@ -188,13 +197,13 @@ class CompilationOutputWriter:
         Returns:
             Tuple of (plan_dir, case_dir).
         """
-        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+        # 整批输出共用同一时间戳，避免逐文件重复取时间与格式化
+        now = datetime.now(timezone.utc)
+        timestamp = now.strftime('%Y%m%dT%H%M%SZ')
         if plan_name is None:
             plan_name = f'{timestamp}_data_driven_plan'
 
         plan_dir = output_root / plan_name
-        plan_dir.mkdir(parents=True, exist_ok=True)
-
         case_dir = plan_dir / 'cases'
         case_dir.mkdir(parents=True, exist_ok=True)
 
@@ -202,8 +211,8 @@ class CompilationOutputWriter:
             case_name = 'case'
 
         CompilationOutputWriter._write_template(result.template_plan, plan_dir)
-        CompilationOutputWriter._write_stats(result.stats, plan_dir)
-        CompilationOutputWriter._write_cases(result.cases, case_dir, case_name)
+        CompilationOutputWriter._write_stats(result.stats, plan_dir, now)
+        CompilationOutputWriter._write_cases(result.cases, case_dir, case_name, timestamp)
 
         result.plan_dir = plan_dir
         result.case_dir = case_dir
@@ -221,19 +230,18 @@ class CompilationOutputWriter:
         Returns:
             Path to written file.
         """
-        template_path = plan_dir / 'action_plan_template.json'
-        with open(template_path, 'w', encoding='utf-8') as f:
-            json.dump(template, f, ensure_ascii=False, indent=2)
+        template_path = write_json(plan_dir / 'action_plan_template.json', template)
         logger.info(f'模板已保存: {template_path}')
         return template_path
 
     @staticmethod
-    def _write_stats(stats: ReplacementStats, plan_dir: Path) -> Path:
+    def _write_stats(stats: ReplacementStats, plan_dir: Path, generated_at: datetime) -> Path:
         """Write statistics to file.
 
         Args:
             stats: The ReplacementStats object.
             plan_dir: Directory to write to.
+            generated_at: UTC time of this output batch.
 
         Returns:
             Path to written file.
@@ -243,36 +251,33 @@ class CompilationOutputWriter:
             'successful_items': stats.successful_items,
             'failed_items': stats.failed_items,
             'error_summary': stats.get_error_summary(),
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': generated_at.replace(tzinfo=None).isoformat() + 'Z',
         }
 
-        stats_path = plan_dir / 'stats.json'
-        with open(stats_path, 'w', encoding='utf-8') as f:
-            json.dump(stats_data, f, ensure_ascii=False, indent=2)
+        stats_path = write_json(plan_dir / 'stats.json', stats_data)
         logger.info(f'统计信息已保存: {stats_path}')
         return stats_path
 
     @staticmethod
-    def _write_cases(cases: List[Dict[str, object]], case_dir: Path, case_name: str) -> List[Path]:
+    def _write_cases(cases: List[Dict[str, object]], case_dir: Path, case_name: str, timestamp: str) -> List[str]:
         """Write compiled test cases to files.
 
         Args:
             cases: List of compiled ActionPlans.
             case_dir: Directory to write cases to.
             case_name: Prefix for case filenames.
+            timestamp: Batch timestamp appended to each filename.
 
         Returns:
-            List of written file paths.
+            List of written file paths (as strings).
         """
-        written_paths = []
-        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+        # 逐用例路径直接拼接字符串，避免循环内反复构造 Path 对象
+        path_prefix = os.path.join(os.fspath(case_dir), f'{case_name}_')
+        written_paths = [f'{path_prefix}{i:03d}_{timestamp}.json' for i in range(1, len(cases) + 1)]
 
-        for i, case in enumerate(cases):
-            filename = f'{case_name}_{i + 1:03d}_{timestamp}.json'
-            filepath = case_dir / filename
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(case, f, ensure_ascii=False, indent=2)
-            written_paths.append(filepath)
+        for filepath, case in zip(written_paths, cases):
+            with open(filepath, 'wb') as f:
+                f.write(dumps_pretty(case))
 
         logger.info(f'共输出 {len(written_paths)} 个测试用例到: {case_dir}')
         return written_paths
@@ -325,10 +330,7 @@ class CompilationErrorReporter:
             return None
 
         report = CompilationErrorReporter.generate_error_report(stats)
-        errors_path = plan_dir / 'errors.json'
-
-        with open(errors_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        errors_path = write_json(plan_dir / 'errors.json', report)
 
         logger.warning(f'错误报告已保存: {errors_path}')
         return errors_path
@@ -0,0 +1,43 @@
+"""JSON serialization helpers, backed by orjson when it is installed."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON from bytes or text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def read_json(path: Path) -> Any:
+    """Read and parse a UTF-8 JSON file without decoding it to text first."""
+    return loads(path.read_bytes())
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes with two-space indentation and raw non-ASCII text."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_json(path: Path, obj: Any) -> Path:
+    """Write ``obj`` to ``path`` as pretty-printed JSON in a single write."""
+    path.write_bytes(dumps_pretty(obj))
+    return path
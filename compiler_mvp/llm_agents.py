@@ -2,12 +2,32 @@
 from __future__ import annotations
 
 import json
+import weakref
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, TypeVar
 
+from .json_utils import read_json
 from .models import SiteProfile, TestRequest
 
+_T = TypeVar("_T")
+
+# 按对象身份缓存摘要文本，对象被回收时自动清理
+_profile_summary_cache: Dict[int, str] = {}
+_request_summary_cache: Dict[int, str] = {}
+_spec_prompt_cache: Dict[int, str] = {}
+
+
+def _summarize_once(cache: Dict[int, str], obj: _T, build: Callable[[_T], str]) -> str:
+    key = id(obj)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    text = build(obj)
+    cache[key] = text
+    weakref.finalize(obj, cache.pop, key, None)
+    return text
+
 
 @dataclass
 class DSLSpecification:
@@ -17,6 +37,10 @@ class DSLSpecification:
     sample: Dict[str, object]
 
     def as_prompt(self) -> str:
+        # 规范提示词作为请求的固定前缀，每个规范对象只生成一次，保证逐字节一致以命中服务端前缀缓存
+        return _summarize_once(_spec_prompt_cache, self, DSLSpecification._build_prompt)
+
+    def _build_prompt(self) -> str:
         schema_json = json.dumps(self.schema, ensure_ascii=False, indent=2)
         sample_json = json.dumps(self.sample, ensure_ascii=False, indent=2)
         guidelines = ("生成 ActionPlan 时请遵循以下规则：\n"
@@ -60,9 +84,13 @@ class SiteProfileSummarizer:
 
     @staticmethod
     def summarize(profile: SiteProfile) -> str:
+        return _summarize_once(_profile_summary_cache, profile, SiteProfileSummarizer._build)
+
+    @staticmethod
+    def _build(profile: SiteProfile) -> str:
         grouped: Dict[str, List[str]] = {}
         for alias in profile.aliases.values():
-            role_info = f", role=\"{alias.role}\"" if hasattr(alias, 'role') and alias.role else ""
+            role_info = f", role=\"{alias.role}\"" if alias.role else ""
             grouped.setdefault(alias.page_id, []).append(f"- `{alias.name}` → `{alias.selector}`{role_info} ({alias.description or '无描述'})")
         lines = ["站点 Profile 摘要（请特别注意每个元素的 role 字段）："]
         for page_id, items in grouped.items():
@@ -76,6 +104,10 @@ class TestRequestSummarizer:
 
     @staticmethod
     def summarize(request: TestRequest) -> str:
+        return _summarize_once(_request_summary_cache, request, TestRequestSummarizer._build)
+
+    @staticmethod
+    def _build(request: TestRequest) -> str:
         lines = [f"测试用例：{request.title}"]
         if request.base_url:
             lines.append(f"基准 URL：{request.base_url}")
@@ -86,7 +118,7 @@ class TestRequestSummarizer:
 
 
 def load_dsl_specification(schema_path: Path) -> DSLSpecification:
-    schema = json.loads(schema_path.read_text(encoding="utf-8"))
+    schema = read_json(schema_path)
     sample = {
         "meta": {
             "testId": "SAMPLE-001",
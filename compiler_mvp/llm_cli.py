@@ -5,7 +5,8 @@ import argparse
 import json
 import logging
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Sequence
 
@@ -19,9 +20,8 @@ except ImportError:  # pragma: no cover - optional dependency
         return False
 
 
-from .data_driven_compiler import (CompilationErrorReporter,
-                                   CompilationOutputWriter, DataDrivenCompiler,
-                                   DataSetLoader)
+from .data_driven_compiler import (CompilationErrorReporter, CompilationOutputWriter, DataDrivenCompiler, DataSetLoader)
+from .json_utils import dumps_pretty, read_json
 from .llm_pipeline import run_pipeline
 from .site_profile_loader import load_site_profile
 from .test_request_parser import parse_markdown
@@ -55,6 +55,17 @@ def build_parser() -> argparse.ArgumentParser:
         default=0.2,
         help="LLM temperature (default: 0.2)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of speculative LLM attempts issued concurrently when temperature > 0 (default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the local LLM completion cache enabled by env LLM_CACHE_DIR",
+    )
     parser.add_argument(
         "--api-timeout",
         type=float,
@@ -91,7 +102,7 @@ def main(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
 
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     print(f"Compiler run at: {timestamp}")
 
     has_dataset = args.dataset and args.dataset_category
@@ -110,6 +121,8 @@ def main(argv: Sequence[str] | None = None) -> int:
                 max_attempts=args.attempts,
                 temperature=args.temperature,
                 api_timeout=args.api_timeout,
+                concurrency=args.concurrency,
+                use_cache=not args.no_cache,
                 skip_llm=args.skip_llm,
                 output_stats=args.output_stats,
                 summary=args.summary,
@@ -133,6 +146,9 @@ def main(argv: Sequence[str] | None = None) -> int:
                 max_attempts=args.attempts,
                 temperature=args.temperature,
                 api_timeout=args.api_timeout,
+                concurrency=args.concurrency,
+                keep_payload=args.summary,
+                use_cache=not args.no_cache,
             )
         except Exception as exc:
             logging.error("LLM 编译流程失败: %s", exc)
@@ -141,9 +157,7 @@ def main(argv: Sequence[str] | None = None) -> int:
         print(f"LLM plan generated for {result.test_id} at {result.case_dir}")
 
         if args.summary:
-            payload_path = result.case_dir / "action_plan.json"
-            payload = json.loads(payload_path.read_text(encoding="utf-8"))
-            print(json.dumps(payload, ensure_ascii=False, indent=2))
+            print(dumps_pretty(result.payload).decode("utf-8"))
 
         return 0
 
@@ -160,12 +174,19 @@ def _compile_with_dataset(
     max_attempts: int,
     temperature: float,
     api_timeout: float | None,
+    concurrency: int,
+    use_cache: bool,
     skip_llm: bool,
     output_stats: bool,
     summary: bool,
 ) -> int:
     """Execute data-driven compilation pipeline."""
 
+    # 数据集在后台线程预读，与 LLM 编译（或模板读取）重叠；shutdown 不等待，已提交的任务照常执行
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    dataset_future = prefetcher.submit(DataSetLoader.load_from_file, dataset_path)
+    prefetcher.shutdown(wait=False)
+
     profile = load_site_profile(profile_path)
 
     if skip_llm:
@@ -175,8 +196,7 @@ def _compile_with_dataset(
         template_path = output_root / plan_name / "action_plan_template.json"
         if not template_path.exists():
             raise FileNotFoundError(f"模板文件不存在: {template_path}")
-        with open(template_path, encoding="utf-8") as f:
-            template_plan = json.load(f)
+        template_plan = read_json(template_path)
     else:
         logging.info("执行 LLM 编译生成模板")
         request = parse_markdown(request_path)
@@ -190,13 +210,14 @@ def _compile_with_dataset(
             max_attempts=max_attempts,
             temperature=temperature,
             api_timeout=api_timeout,
+            concurrency=concurrency,
+            keep_payload=True,
+            use_cache=use_cache,
         )
-        template_plan_path = result.case_dir / "action_plan.json"
-        with open(template_plan_path, encoding="utf-8") as f:
-            template_plan = json.load(f)
+        template_plan = result.payload
 
     logging.info("加载数据集")
-    raw_dataset = DataSetLoader.load_from_file(dataset_path)
+    raw_dataset = dataset_future.result()
     dataset = DataSetLoader.extract_category(raw_dataset, dataset_category)
     logging.info(f"已加载 {len(dataset.items)} 个数据项")
 
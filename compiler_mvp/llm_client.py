@@ -1,12 +1,21 @@
 """LLM client implemented via the OpenAI Chat Completions API."""
 from __future__ import annotations
 
+import contextlib
+import hashlib
 import os
+import tempfile
+import time
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from .json_utils import dumps
 
 DEFAULT_TIMEOUT = 60.0
+# 本地补全缓存的保留时间，超过后在客户端初始化时清理
+CACHE_TTL_SECONDS = 7 * 24 * 3600
 
 
 class LLMClientError(RuntimeError):
@@ -23,6 +32,7 @@ class LLMClient:
         base_url: Optional[str] = None,
         default_model: Optional[str] = None,
         timeout: Optional[float] = None,
+        use_cache: bool = True,
     ) -> None:
         env_api_key = api_key or os.getenv("OPENAI_API_KEY") or os.getenv("API_KEY")
         if not env_api_key:
@@ -37,6 +47,14 @@ class LLMClient:
         self.timeout = timeout or (float(timeout_env) if timeout_env else DEFAULT_TIMEOUT)
         self.model = env_model
         self.client = OpenAI(api_key=env_api_key, base_url=env_base_url)
+        self._api_key = env_api_key
+        self._base_url = env_base_url
+        self._async_client: Optional[AsyncOpenAI] = None
+        # 设置 LLM_CACHE_DIR 后按提示词哈希在本地缓存补全结果
+        cache_dir = os.getenv("LLM_CACHE_DIR") if use_cache else None
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self._prune_cache()
 
     def chat_completion(
         self,
@@ -46,6 +64,10 @@ class LLMClient:
         temperature: float = 0.2,
     ) -> str:
         target_model = model or self.model
+        cache_path = self._cache_path(target_model, temperature, messages)
+        cached = self._read_cache(cache_path)
+        if cached is not None:
+            return cached
         try:
             response = self.client.chat.completions.create(
                 model=target_model,
@@ -56,18 +78,115 @@ class LLMClient:
         except Exception as exc:  # pragma: no cover - SDK 提供的异常层级
             raise LLMClientError(f"LLM API 调用失败：{exc}") from exc
 
+        return self._extract_text(response)
+
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+    ) -> str:
+        """Async variant of :meth:`chat_completion` for concurrent requests."""
+        target_model = model or self.model
+        cache_path = self._cache_path(target_model, temperature, messages)
+        cached = self._read_cache(cache_path)
+        if cached is not None:
+            return cached
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self._api_key, base_url=self._base_url)
+        try:
+            response = await self._async_client.chat.completions.create(
+                model=target_model,
+                messages=messages,
+                temperature=temperature,
+                timeout=self.timeout,
+            )
+        except Exception as exc:  # pragma: no cover - SDK 提供的异常层级
+            raise LLMClientError(f"LLM API 调用失败：{exc}") from exc
+
+        return self._extract_text(response)
+
+    def store(
+        self,
+        messages: List[Dict[str, Any]],
+        completion: str,
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+    ) -> None:
+        """Cache a completion once the caller has accepted it; rejected replies are never cached."""
+        self._write_cache(self._cache_path(model or self.model, temperature, messages), completion)
+
+    async def aclose(self) -> None:
+        """Close the async HTTP client; it is bound to the event loop that created it."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def _cache_path(self, model: str, temperature: float, messages: List[Dict[str, Any]]) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        key = hashlib.blake2b(dumps([self._base_url, model, temperature, messages]), digest_size=16).hexdigest()
+        return self.cache_dir / f"{key}.txt"
+
+    @staticmethod
+    def _read_cache(cache_path: Optional[Path]) -> Optional[str]:
+        if cache_path is None:
+            return None
+        try:
+            return cache_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_cache(cache_path: Optional[Path], text: str) -> None:
+        """Store ``text`` atomically; cache failures never fail the completion."""
+        if cache_path is None:
+            return
+        tmp_path: Optional[str] = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(text)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+
+    def _prune_cache(self) -> None:
+        """Remove cache entries (and leftover temp files) older than the TTL."""
+        cutoff = time.time() - CACHE_TTL_SECONDS
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for entry in entries:
+            if not entry.name.endswith((".txt", ".tmp")):
+                continue
+            with contextlib.suppress(OSError):
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+
+    @staticmethod
+    def _extract_text(response: Any) -> str:
         if not response.choices:
             raise LLMClientError("LLM 返回结果为空")
 
         message = response.choices[0].message
-        content = getattr(message, "content", None)
+        try:
+            content = message.content
+        except AttributeError:
+            content = None
         if isinstance(content, str):
             return content
 
         # ChatCompletionMessage content 可能是列表
         if isinstance(content, list):
-            texts = [item.get("text") for item in content if isinstance(item, dict) and item.get("text")]
-            if texts:
-                return "".join(texts)
+            text = "".join(part for item in content if isinstance(item, dict) and (part := item.get("text")))
+            if text:
+                return text
 
         raise LLMClientError("LLM 返回结果不包含文本内容")
@@ -1,27 +1,120 @@
 """LLM-driven compilation pipeline."""
 from __future__ import annotations
 
+import asyncio
+import copy
 import datetime
+import functools
+import hashlib
+import itertools
 import json
+import os
 import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from jsonschema import Draft7Validator, ValidationError
 
-from .llm_agents import (SiteProfileSummarizer, TestRequestSummarizer, load_dsl_specification)
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover - optional dependency
+    fastjsonschema = None
+
+from .llm_agents import (DSLSpecification, SiteProfileSummarizer, TestRequestSummarizer, load_dsl_specification)
+from .json_utils import loads as json_loads
+from .json_utils import write_json
 from .llm_client import LLMClient, LLMClientError
 from .models import (CompilationResult, CompiledStep, SiteAlias, SiteProfile, TestRequest)
 
-JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
 CONTAINS_SELECTOR_PATTERN = re.compile(r":contains\((['\"])\s*(.*?)\s*\1\)")
+SLUG_SEPARATOR_PATTERN = re.compile(r"[^A-Za-z0-9]+")
+# 分词：先按选择器分隔符粗分，含其他字符的片段再按非字母数字细分
+TOKEN_SEPARATOR_PATTERN = re.compile(r"[\s._#:\-]+")
+ALNUM_SEPARATOR_PATTERN = re.compile(r"[^a-z0-9]+")
+NAME_PART_SEPARATOR_PATTERN = re.compile(r"[._\-]+")
 COUNT_ASSERT_KINDS = {"count_equals", "count_at_least"}
+# 产物校验：执行器不支持的选择器语法，以及允许的断言类型
+DISALLOWED_SELECTOR_PATTERN = re.compile(r":contains|::|contains\(|\[text\(\)")
+ALLOWED_ASSERT_KINDS = frozenset({"visible", "text_contains", "text_equals", "text_regex", "invisible", "count_equals", "count_at_least"})
+# 点击/输入/断言目标匹配使用的关键词 token
+INTERACTIVE_ALIAS_KEYWORDS = frozenset(
+    {'button', 'btn', 'buy', 'purchase', 'click', 'link', 'submit', 'confirm', '按钮', '购买', '点击', '提交', '确定', '购买按钮', 'buy_list', 'buybtn'})
+INPUT_ALIAS_KEYWORDS = frozenset({'input', 'field', 'textbox', 'text', 'search', 'fill', 'enter', '输入', '框', '文本框', '搜索', '填入', 'searchData', 'searchDatahead'})
+# 购买按钮类别名的名称/描述片段（点击匹配加权；点击这类别名时不附加 :has-text()）
+BUY_ALIAS_KEYWORDS = ('buy', 'purchase', '购买', 'buy_list', 'shoppingCart_list')
+DISPLAY_ALIAS_KEYWORDS = frozenset(
+    {'title', 'text', 'label', 'name', 'content', 'value', 'price', '标题', '文本', '名称', '内容', '价格', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+# 基于 role 的点击修正：被误点击的文本类 role、可替代的交互类 role，以及「文本指示词 -> 按钮指示词」的语义关联
+TEXT_ROLES = frozenset({'文本', 'text', '标题', 'title', '标签', 'label'})
+INTERACTIVE_ROLES = frozenset({'按钮', 'button', '链接', 'link'})
+ROLE_SEMANTIC_MATCHES = (
+    (('商品', '名称', 'product', 'name'), ('buy', 'purchase', '购买', 'detail', '详情')),
+    (('标题', 'title', 'heading'), ('link', 'button', '链接', '按钮')),
+)
+# 推测式并发请求之间的温度递增步长与上限，使并发采样彼此不同（也避免命中同一条本地缓存）
+SPECULATIVE_TEMPERATURE_STEP = 0.15
+SPECULATIVE_TEMPERATURE_MAX = 1.0
+# 校验失败时回传给 LLM 的最大错误条数
+MAX_REPORTED_ERRORS = 5
+SYSTEM_PROMPT = {
+    "role": "system",
+    "content": ("你是一名资深的 UI 自动化 DSL 编译专家。"
+                "请严格遵守提供的 JSON Schema，并只输出 JSON。"),
+}
+# 计划目录名使用东八区时间
+PLAN_TIMEZONE = datetime.timezone(datetime.timedelta(hours=8))
+# 影响 LLMClient 构造结果的环境变量，作为共享客户端缓存键的一部分
+CLIENT_ENV_KEYS = ("OPENAI_API_KEY", "API_KEY", "OPENAI_BASE_URL", "BASE_URL", "OPENAI_MODEL", "MODEL_STD", "LLM_TIMEOUT", "LLM_CACHE_DIR")
+
+
+def _contains_to_has_text(match: re.Match[str]) -> str:
+    text = match.group(2).replace('"', '\\"')
+    return f':has-text("{text}")'
+
+
+@functools.lru_cache(maxsize=256)
+def _has_text_suffix(value: str) -> str:
+    # 同一文案常在多个步骤中复用，转义与拼接结果按文案缓存
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f':has-text("{escaped}")'
+
+
+def _find_closing_brace(text: str, start: int) -> int:
+    """Return the index of the brace closing ``text[start]``, or -1 if unbalanced."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    return -1
 
 
 def extract_json_block(text: str) -> str:
-    match = JSON_BLOCK_RE.search(text)
-    if match:
-        return match.group(1)
+    # 优先定位代码块围栏之后的第一个对象，再按括号配对线性扫描，避免正则回溯
+    fence = text.find("```")
+    start = text.find("{", fence + 3) if fence != -1 else -1
+    if start == -1:
+        start = text.find("{")
+    if start != -1:
+        end = _find_closing_brace(text, start)
+        if end != -1:
+            return text[start:end + 1]
     first_brace = text.find("{")
     last_brace = text.rfind("}")
     if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
@@ -36,14 +129,203 @@ def derive_base_url(request: TestRequest) -> str:
 
 
 def derive_test_id(title: str) -> str:
-    import hashlib
-    slug = re.sub(r"[^A-Za-z0-9]+", "-", title).strip("-")
+    slug = SLUG_SEPARATOR_PATTERN.sub("-", title).strip("-")
     if slug:
         return f"REQ-{slug.upper()}"
-    digest = hashlib.md5(title.encode("utf-8")).hexdigest()[:8].upper()
+    digest = hashlib.blake2b(title.encode("utf-8"), digest_size=4).hexdigest().upper()
     return f"REQ-{digest}"
 
 
+def _compile_is_valid(schema: Dict[str, object]) -> Callable[[object], bool]:
+    """Return a validity check for ``schema``, compiled by fastjsonschema when it is installed."""
+    fallback = Draft7Validator(schema).is_valid
+    if fastjsonschema is None:
+        return fallback
+    try:
+        # 与 Draft7Validator 保持一致：不校验 format，也不向 payload 写入默认值
+        validate = fastjsonschema.compile(schema, use_default=False, use_formats=False)
+    except fastjsonschema.JsonSchemaDefinitionException:
+        return fallback
+
+    def is_valid(payload: object) -> bool:
+        try:
+            validate(payload)
+        except fastjsonschema.JsonSchemaException:
+            return False
+        return True
+
+    return is_valid
+
+
+def _split_steps_schema(schema: Dict[str, object]) -> Optional[Tuple[Callable[[object], bool], Callable[[object], bool]]]:
+    """Build ``(shell, step)`` validity checks so unchanged steps can skip re-validation."""
+    steps_schema = schema.get("properties", {}).get("steps")
+    if not isinstance(steps_schema, dict) or not isinstance(steps_schema.get("items"), dict):
+        return None
+    # 步骤子 Schema 含 $ref 时无法脱离根文档单独校验
+    if "$ref" in json.dumps(steps_schema["items"]):
+        return None
+    shell_schema = copy.deepcopy(schema)
+    step_schema = shell_schema["properties"]["steps"].pop("items")
+    return _compile_is_valid(shell_schema), _compile_is_valid(step_schema)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_spec_and_validator(
+    schema_path: str,
+    mtime_ns: int,
+) -> Tuple[DSLSpecification, Draft7Validator, Callable[[object], bool], Optional[Tuple[Callable[[object], bool], Callable[[object], bool]]]]:
+    """Load the DSL spec and build its validators once per schema file version.
+
+    The Draft7Validator is kept for readable error messages; the compiled checks decide validity.
+    """
+    del mtime_ns  # 仅用于缓存键，Schema 文件修改后自动失效
+    spec = load_dsl_specification(Path(schema_path))
+    return spec, Draft7Validator(spec.schema), _compile_is_valid(spec.schema), _split_steps_schema(spec.schema)
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_client(api_timeout: Optional[float], use_cache: bool, env_snapshot: Tuple[Optional[str], ...]) -> LLMClient:
+    del env_snapshot  # 仅用于缓存键
+    return LLMClient(timeout=api_timeout, use_cache=use_cache)
+
+
+def get_shared_client(api_timeout: Optional[float] = None, use_cache: bool = True) -> LLMClient:
+    """Return an LLMClient reused across pipeline runs so its HTTP connection pool is kept."""
+    return _cached_client(api_timeout, use_cache, tuple(os.getenv(key) for key in CLIENT_ENV_KEYS))
+
+
+def _extract_tokens(text: Optional[str]) -> Set[str]:
+    """Split a selector/name/description into lowercase tokens of at least two characters."""
+    tokens: Set[str] = set()
+    if not text:
+        return tokens
+    # 粗分隔符都属于细分隔符，因此只需对含其他字符的粗分片段再细分，结果与整体分别切分两次相同
+    for part in TOKEN_SEPARATOR_PATTERN.split(text.lower()):
+        if len(part) < 2:
+            continue
+        tokens.add(part)
+        if not (part.isascii() and part.isalnum()):
+            tokens.update(piece for piece in ALNUM_SEPARATOR_PATTERN.split(part) if len(piece) >= 2)
+    return tokens
+
+
+@dataclass
+class _AliasFeatures:
+    """Lowercased fields and token sets of one alias, derived once per compilation."""
+
+    alias: SiteAlias
+    selector_lower: str
+    name_lower: str
+    desc_lower: str
+    role_lower: str
+    selector_tokens: Set[str]
+    name_tokens: Set[str]
+    desc_tokens: Set[str]
+    # 兜底匹配使用的名称片段与描述词（长度 >= 3）
+    name_parts: List[str]
+    desc_words: List[str]
+    # 名称按 "." 切分的各段，role 修正时比较名称相似度
+    name_segments: FrozenSet[str]
+    # 步骤后处理使用的别名分类：购买按钮、图片、列表
+    is_buy: bool
+    is_image: bool
+    is_list: bool
+    # 三组 token 在 _AliasIndex.token_ids 下的位集，打分时以按位与 + popcount 代替集合求交
+    selector_bits: int = 0
+    name_bits: int = 0
+    desc_bits: int = 0
+
+    @classmethod
+    def build(cls, alias: SiteAlias) -> "_AliasFeatures":
+        name_lower = alias.name.lower()
+        desc_lower = (alias.description or "").lower()
+        return cls(
+            alias=alias,
+            selector_lower=alias.selector.lower(),
+            name_lower=name_lower,
+            desc_lower=desc_lower,
+            role_lower=(alias.role or "").lower(),
+            selector_tokens=_extract_tokens(alias.selector),
+            name_tokens=_extract_tokens(alias.name),
+            desc_tokens=_extract_tokens(alias.description),
+            name_parts=[token for token in NAME_PART_SEPARATOR_PATTERN.split(name_lower) if len(token) >= 3],
+            desc_words=[token for token in desc_lower.split() if len(token) >= 3],
+            name_segments=frozenset(name_lower.split('.')),
+            is_buy=any(keyword in name_lower or keyword in desc_lower for keyword in BUY_ALIAS_KEYWORDS),
+            is_image="image" in name_lower or "img" in name_lower or "图片" in desc_lower,
+            is_list="list" in name_lower,
+        )
+
+
+@dataclass
+class _AliasIndex:
+    """Lookup tables over a profile's aliases, built once per compilation."""
+
+    features: List[_AliasFeatures]
+    by_selector: Dict[str, SiteAlias]
+    features_by_name: Dict[str, _AliasFeatures]
+    # 标题类与大学列表类别名，供非 click/fill/assert 步骤的兜底匹配使用
+    title_aliases: List[SiteAlias]
+    university_aliases: List[SiteAlias]
+    # 所有别名 token 的编号，每个 token 占位集中的一位
+    token_ids: Dict[str, int]
+    # 交互关键词在本 profile 中出现的 token 位集，供点击匹配打分
+    interactive_mask: int = 0
+    # 输入/断言步骤的兜底目标只取决于别名本身：第一个名称或描述含输入/显示关键词的别名
+    input_alias: Optional[SiteAlias] = None
+    display_alias: Optional[SiteAlias] = None
+
+    @classmethod
+    def build(cls, aliases: Iterable[SiteAlias]) -> "_AliasIndex":
+        features = [_AliasFeatures.build(alias) for alias in aliases]
+        token_ids: Dict[str, int] = {}
+        for item in features:
+            for token in itertools.chain(item.selector_tokens, item.name_tokens, item.desc_tokens):
+                token_ids.setdefault(token, len(token_ids))
+        index = cls(
+            features=features,
+            by_selector={item.alias.selector: item.alias
+                         for item in features},
+            features_by_name={item.alias.name: item
+                              for item in features},
+            title_aliases=[item.alias for item in features if cls._is_title_alias(item)],
+            university_aliases=[item.alias for item in features if cls._is_university_alias(item)],
+            token_ids=token_ids,
+        )
+        for item in features:
+            item.selector_bits = index.encode(item.selector_tokens)
+            item.name_bits = index.encode(item.name_tokens)
+            item.desc_bits = index.encode(item.desc_tokens)
+        index.interactive_mask = index.encode(INTERACTIVE_ALIAS_KEYWORDS)
+        input_mask = index.encode(INPUT_ALIAS_KEYWORDS)
+        display_mask = index.encode(DISPLAY_ALIAS_KEYWORDS)
+        index.input_alias = next((item.alias for item in features if (item.name_bits | item.desc_bits) & input_mask), None)
+        index.display_alias = next((item.alias for item in features if (item.name_bits | item.desc_bits) & display_mask), None)
+        return index
+
+    def encode(self, tokens: Iterable[str]) -> int:
+        """Return the bitset of ``tokens``; tokens unknown to the profile contribute nothing."""
+        bits = 0
+        token_ids = self.token_ids
+        for token in tokens:
+            token_id = token_ids.get(token)
+            if token_id is not None:
+                bits |= 1 << token_id
+        return bits
+
+    @staticmethod
+    def _is_title_alias(item: _AliasFeatures) -> bool:
+        return "title" in item.name_lower or "heading" in item.name_lower or "标题" in item.desc_lower or "title" in item.desc_lower
+
+    @staticmethod
+    def _is_university_alias(item: _AliasFeatures) -> bool:
+        name_lower = item.name_lower
+        desc_lower = item.desc_lower
+        return (("results" in name_lower and "item" in name_lower) or ("university" in name_lower and ("item" in name_lower or "list" in name_lower))
+                or ("sidebar" in name_lower and "university" in name_lower) or ("大学" in desc_lower and ("列表" in desc_lower or "选项" in desc_lower)))
+
+
 class LLMCompilationPipeline:
     """Coordinates multiple LLM interactions to produce a valid ActionPlan."""
 
@@ -54,12 +336,18 @@ class LLMCompilationPipeline:
         schema_path: Path,
         max_attempts: int = 3,
         temperature: float = 0.2,
+        concurrency: int = 1,
     ) -> None:
         self.client = client
-        self.spec = load_dsl_specification(schema_path)
-        self.validator = Draft7Validator(self.spec.schema)
+        self.spec, self.validator, self._schema_is_valid, self._step_validators = _load_spec_and_validator(
+            str(schema_path),
+            schema_path.stat().st_mtime_ns,
+        )
+        # 上一轮校验中已通过的步骤（按下标），修正轮次只需重新校验变动的步骤
+        self._validated_steps: Dict[int, object] = {}
         self.max_attempts = max_attempts
         self.temperature = temperature
+        self.concurrency = max(1, concurrency)
 
     def run(
         self,
@@ -69,38 +357,35 @@ class LLMCompilationPipeline:
         *,
         plan_name: Optional[str] = None,
         case_name: Optional[str] = None,
+        keep_payload: bool = False,
     ) -> CompilationResult:
-        messages = self._initial_messages(request, profile)
+        base_messages = self._initial_messages(request, profile)
+        messages = base_messages
+        self._validated_steps = {}
         response_payload: Dict[str, object] | None = None
         validation_error: Optional[str] = None
-
-        for _ in range(1, self.max_attempts + 1):
+        attempts_used = 0
+
+        # temperature 为 0 时多次采样结果相同，推测式并发没有意义
+        speculative_count = min(self.concurrency, self.max_attempts)
+        if speculative_count > 1 and self.temperature > 0:
+            response_payload, validation_error, completion = asyncio.run(self._speculative_attempts(messages, speculative_count))
+            attempts_used = speculative_count
+            if validation_error is not None:
+                messages = self._retry_messages(base_messages, completion, validation_error)
+
+        while attempts_used < self.max_attempts and (response_payload is None or validation_error is not None):
+            attempts_used += 1
             try:
                 completion = self.client.chat_completion(messages, temperature=self.temperature)
             except LLMClientError as exc:
                 raise RuntimeError(f"LLM 调用失败: {exc}") from exc
 
-            try:
-                raw_json = extract_json_block(completion)
-                response_payload = json.loads(raw_json)
-            except json.JSONDecodeError as exc:
-                validation_error = f"JSON 解析失败：{exc}"
-            except ValueError as exc:
-                validation_error = str(exc)
+            response_payload, validation_error = self._parse_completion(completion)
+            if validation_error is None:
+                self.client.store(messages, completion, temperature=self.temperature)
             else:
-                try:
-                    self._validate_payload(response_payload)
-                    validation_error = None
-                    break
-                except ValidationError as exc:
-                    validation_error = self._format_validation_error(exc)
-
-            messages.append({
-                "role": "user",
-                "content": ("上一步生成的 JSON 存在问题：\n"
-                            f"{validation_error}\n"
-                            "请根据错误信息重新输出完整且符合 Schema 的 JSON，仍然只输出 JSON。"),
-            })
+                messages = self._retry_messages(base_messages, completion, validation_error)
 
         if validation_error is not None or response_payload is None:
             raise RuntimeError(f"多次尝试后仍未得到合法的 DSL：{validation_error}")
@@ -114,14 +399,71 @@ class LLMCompilationPipeline:
             profile,
         )
         self._validate_against_profile(result, profile)
+        if keep_payload:
+            result.payload = enriched_payload
         return result
 
-    def _initial_messages(self, request: TestRequest, profile: SiteProfile) -> List[Dict[str, str]]:
-        system_prompt = {
-            "role": "system",
-            "content": ("你是一名资深的 UI 自动化 DSL 编译专家。"
-                        "请严格遵守提供的 JSON Schema，并只输出 JSON。"),
+    async def _speculative_attempts(self, messages: List[Dict[str, str]], count: int) -> Tuple[Optional[Dict[str, object]], Optional[str], str]:
+        """Fire ``count`` completions concurrently with slightly raised temperatures and keep the first one that validates.
+
+        Returns ``(payload, error, completion)`` where ``completion`` is the last response received.
+        """
+        temperatures = [min(self.temperature + index * SPECULATIVE_TEMPERATURE_STEP, SPECULATIVE_TEMPERATURE_MAX) for index in range(count)]
+
+        async def attempt(temperature: float) -> Tuple[float, str]:
+            return temperature, await self.client.achat_completion(messages, temperature=temperature)
+
+        tasks = [asyncio.create_task(attempt(temperature)) for temperature in temperatures]
+        validation_error: Optional[str] = None
+        completion = ""
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    temperature, completion = await next_done
+                except LLMClientError as exc:
+                    raise RuntimeError(f"LLM 调用失败: {exc}") from exc
+                payload, validation_error = self._parse_completion(completion)
+                if validation_error is None:
+                    self.client.store(messages, completion, temperature=temperature)
+                    return payload, None, completion
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.client.aclose()
+        return None, validation_error, completion
+
+    def _parse_completion(self, completion: str) -> Tuple[Optional[Dict[str, object]], Optional[str]]:
+        """Extract, parse and validate a completion; returns ``(payload, error)``."""
+        try:
+            payload = json_loads(extract_json_block(completion))
+        except json.JSONDecodeError as exc:
+            return None, f"JSON 解析失败：{exc}"
+        except ValueError as exc:
+            return None, str(exc)
+        try:
+            self._validate_payload(payload)
+        except ValidationError as exc:
+            return payload, self._format_validation_error(exc)
+        return payload, None
+
+    @staticmethod
+    def _retry_messages(base_messages: List[Dict[str, str]], completion: str, validation_error: str) -> List[Dict[str, str]]:
+        """Build the next attempt's messages from the fixed prefix, the last reply and its correction."""
+        # 只保留最近一次回复及其修正，消息长度不随重试次数增长，前缀保持不变
+        return [*base_messages, {"role": "assistant", "content": completion}, LLMCompilationPipeline._correction_message(validation_error)]
+
+    @staticmethod
+    def _correction_message(validation_error: str) -> Dict[str, str]:
+        return {
+            "role": "user",
+            "content": ("上一步生成的 JSON 存在问题：\n"
+                        f"{validation_error}\n"
+                        "请根据错误信息重新输出完整且符合 Schema 的 JSON，仍然只输出 JSON。"),
         }
+
+    def _initial_messages(self, request: TestRequest, profile: SiteProfile) -> List[Dict[str, str]]:
+        # 不变内容（系统提示、DSL 规范）在前，场景内容在后，修正轮次的回复与修正说明接在其后，前缀保持不变
         spec_prompt = {"role": "user", "content": self.spec.as_prompt()}
         scenario_prompt = {
             "role": "user",
@@ -129,23 +471,46 @@ class LLMCompilationPipeline:
                         f"{SiteProfileSummarizer.summarize(profile)}\n\n"
                         "请基于上述需求生成完整的 ActionPlan JSON。"),
         }
-        return [system_prompt, spec_prompt, scenario_prompt]
+        return [SYSTEM_PROMPT, spec_prompt, scenario_prompt]
 
     def _validate_payload(self, payload: Dict[str, object]) -> None:
-        errors = sorted(self.validator.iter_errors(payload), key=lambda e: e.path)
-        if errors:
-            messages = [self._format_validation_error(error) for error in errors]
-            raise ValidationError("; ".join(messages))
+        if self._is_valid(payload):
+            return
+        errors = list(self.validator.iter_errors(payload))
+        if not errors:
+            return
+        self._remember_valid_steps(payload, errors)
+        messages = [self._format_validation_error(error) for error in errors[:MAX_REPORTED_ERRORS]]
+        raise ValidationError("; ".join(messages))
+
+    def _is_valid(self, payload: Dict[str, object]) -> bool:
+        steps = payload.get("steps")
+        if not self._validated_steps or not isinstance(steps, list):
+            return self._schema_is_valid(payload)
+        # 修正轮次：外壳（meta 与步骤数组本身）照常校验，与上一轮相同且已通过的步骤直接复用结论
+        shell_is_valid, step_is_valid = self._step_validators
+        known = self._validated_steps
+        return shell_is_valid(payload) and all(known.get(index) == step or step_is_valid(step) for index, step in enumerate(steps))
+
+    def _remember_valid_steps(self, payload: Dict[str, object], errors: List[ValidationError]) -> None:
+        steps = payload.get("steps")
+        if self._step_validators is None or not isinstance(steps, list):
+            return
+        failed = {error.path[1] for error in errors if len(error.path) > 1 and error.path[0] == "steps"}
+        self._validated_steps = {index: step for index, step in enumerate(steps) if index not in failed}
 
     @staticmethod
     def _format_validation_error(error: ValidationError) -> str:
-        path = "->".join(str(part) for part in error.path)
-        location = f"在 `{path}` " if path else ""
-        return f"{location}{error.message}"
+        if not error.path:
+            return error.message
+        path = "->".join(map(str, error.path))
+        return f"在 `{path}` {error.message}"
 
     def _ensure_metadata(self, payload: Dict[str, object], request: TestRequest) -> Dict[str, object]:
-        payload = dict(payload)
-        meta = dict(payload.get("meta") or {})
+        # payload 由本流水线独占，直接原地补全 meta，无需整体复制
+        meta = payload.get("meta")
+        if not isinstance(meta, dict):
+            meta = payload["meta"] = {}
         meta.setdefault("testId", derive_test_id(request.title))
         try:
             base_url = derive_base_url(request)
@@ -153,7 +518,6 @@ class LLMCompilationPipeline:
             base_url = meta.get("baseUrl")
         if base_url:
             meta["baseUrl"] = base_url.rstrip("/")
-        payload["meta"] = meta
         return payload
 
     def _materialize_plan(
@@ -167,42 +531,37 @@ class LLMCompilationPipeline:
         test_id = payload["meta"]["testId"]
         base_url = payload["meta"]["baseUrl"]
 
-        sanitized_steps: List[Dict[str, object]] = []
+        # 步骤字典来自本次解析出的 payload，由流水线独占，直接原地修正
+        plan_steps: List[Dict[str, object]] = payload["steps"]
         matched_aliases: List[Optional[SiteAlias]] = []
-        alias_list = list(profile.aliases.values())
-        for step in payload.get("steps", []):
-            step_dict = dict(step)
-            selector = step_dict.get("selector")
+        # 别名的小写字段、token 集合与查找表每次编译只构建一次，逐步骤匹配时直接复用
+        alias_index = _AliasIndex.build(profile.aliases.values())
+        for step in plan_steps:
+            selector = step.get("selector")
             matched_alias: Optional[SiteAlias] = None
             if isinstance(selector, str):
                 sanitized = self._sanitize_selector(selector)
                 sanitized, matched_alias = self._fallback_selector_to_profile(
                     sanitized,
-                    step_dict,
-                    alias_list,
+                    step,
+                    alias_index,
                 )
-                step_dict["selector"] = sanitized
-            sanitized_steps.append(step_dict)
+                step["selector"] = sanitized
             matched_aliases.append(matched_alias)
 
-        self._post_process_steps(sanitized_steps, matched_aliases, alias_list)
-        payload["steps"] = sanitized_steps
+        self._post_process_steps(plan_steps, matched_aliases, alias_index)
 
-        now_gmt8 = datetime.datetime.utcnow() + datetime.timedelta(hours=8)
-        timestamp = now_gmt8.strftime("%Y%m%dT%H%M%S")
-        generated_plan_name = plan_name or f"{timestamp}_llm_plan"
+        generated_plan_name = plan_name or f"{datetime.datetime.now(PLAN_TIMEZONE):%Y%m%dT%H%M%S}_llm_plan"
         plan_dir = plan_root / generated_plan_name
-        plan_dir.mkdir(parents=True, exist_ok=True)
 
         generated_case_name = case_name or f"case_{test_id.lower()}"
         case_dir = plan_dir / "cases" / generated_case_name
+        # parents=True 会一并创建 plan_dir
         case_dir.mkdir(parents=True, exist_ok=True)
 
-        output_path = case_dir / "action_plan.json"
-        with output_path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, ensure_ascii=False, indent=2)
+        write_json(case_dir / "action_plan.json", payload)
 
-        steps = [CompiledStep(**dict(step.items())) for step in payload["steps"]]
+        steps = [CompiledStep.from_mapping(step) for step in plan_steps]
         return CompilationResult(
             test_id=test_id,
             base_url=base_url,
@@ -215,9 +574,13 @@ class LLMCompilationPipeline:
         self,
         steps: List[Dict[str, object]],
         matched_aliases: List[Optional[SiteAlias]],
-        aliases: List[SiteAlias],
+        alias_index: _AliasIndex,
     ) -> None:
+        alias_features = alias_index.features
+        features_by_name = alias_index.features_by_name
         value_by_alias: Dict[str, str] = {}
+        # 列表别名对应的条目别名只查找一次，重复点击同一列表时直接复用
+        related_by_list: Dict[str, Optional[SiteAlias]] = {}
 
         last_value: Optional[str] = None
 
@@ -246,8 +609,7 @@ class LLMCompilationPipeline:
                     continue
 
                 # 检查是否为图片验证
-                is_image_assertion = ("img" in selector.lower()
-                                      or (alias and ("image" in alias.name.lower() or "img" in alias.name.lower() or "图片" in (alias.description or ""))))
+                is_image_assertion = "img" in selector.lower() or (alias and features_by_name[alias.name].is_image)
 
                 if is_image_assertion:
                     # 图片验证不应包含文本验证
@@ -279,8 +641,10 @@ class LLMCompilationPipeline:
                 value = step.get("value")
                 if not value and alias:
                     value = value_by_alias.get(alias.selector) or value_by_alias.get(alias.name)
-                    if not value and "list" in alias.name.lower():
-                        related = self._find_related_item_alias(alias, aliases)
+                    if not value and features_by_name[alias.name].is_list:
+                        if alias.name not in related_by_list:
+                            related_by_list[alias.name] = self._find_related_item_alias(alias, alias_features)
+                        related = related_by_list[alias.name]
                         if related:
                             alias = related
                             selector = related.selector
@@ -290,17 +654,17 @@ class LLMCompilationPipeline:
 
                 # 通用智能修正：基于role字段修正click操作
                 # 如果click了role="文本"的元素，自动查找相关的role="按钮"或"链接"元素
-                corrected = self._correct_click_by_role_mismatch(selector, step, alias, aliases, value_by_alias, last_value)
+                corrected = self._correct_click_by_role_mismatch(selector, step, alias, alias_index, value_by_alias, last_value)
                 if corrected:
                     selector, alias, value = corrected
 
                 if value:
                     # 检查是否为购买按钮，如果是则不加has-text
-                    is_buy_button = alias and any(keyword in alias.name.lower() or keyword in (alias.description or "").lower()
-                                                  for keyword in ['buy', 'purchase', '购买', 'buy_list', 'shoppingCart_list'])
+                    is_buy_button = alias and features_by_name[alias.name].is_buy
 
                     # 检查是否为图片验证，图片不应包含文本
-                    is_image_assertion = (step.get("kind") == "visible" and ("img" in selector.lower() or (alias and "image" in alias.name.lower())))
+                    is_image_assertion = (step.get("kind") == "visible"
+                                          and ("img" in selector.lower() or (alias and "image" in features_by_name[alias.name].name_lower)))
 
                     if is_buy_button or is_image_assertion:
                         step["selector"] = selector  # 购买按钮和图片都不加has-text
@@ -319,14 +683,13 @@ class LLMCompilationPipeline:
     def _append_has_text(selector: str, value: str) -> str:
         if ":has-text(" in selector:
             return selector
-        escaped = value.replace('"', '\"')
-        return f'{selector}:has-text("{escaped}")'
+        return selector + _has_text_suffix(value)
 
     @staticmethod
     def _correct_click_by_role_mismatch(selector: str,
                                         step: Dict[str, object],
                                         alias: Optional[SiteAlias],
-                                        aliases: List[SiteAlias],
+                                        alias_index: _AliasIndex,
                                         value_by_alias: Dict[str, str],
                                         last_value: Optional[str] = None) -> Optional[Tuple[str, SiteAlias, str]]:
         """
@@ -337,39 +700,45 @@ class LLMCompilationPipeline:
         if not alias:
             return None
 
-        current_role = getattr(alias, 'role', None)
-        if not current_role:
+        current_features = alias_index.features_by_name[alias.name]
+        if not current_features.role_lower:
             return None
 
         # 只处理role为"文本"的错误点击
-        text_roles = {'文本', 'text', '标题', 'title', '标签', 'label'}
-        if current_role.lower() not in text_roles:
+        if current_features.role_lower not in TEXT_ROLES:
             return None
 
         # 获取当前元素的上下文信息
         value = step.get("value") or last_value or ""
-        alias_name_lower = alias.name.lower()
-        alias_desc_lower = (alias.description or "").lower()
+        value_lower = value.lower()
+        alias_name_lower = current_features.name_lower
+        alias_desc_lower = current_features.desc_lower
         target_page_id = alias.page_id
 
+        name_keywords = current_features.name_segments
+        # 语义关联：如果文本是"商品名称"，优先找"购买按钮"或"详情链接"；文本侧只取决于当前别名，循环外判断一次
+        wanted_button_indicators = [
+            button_indicators for text_indicators, button_indicators in ROLE_SEMANTIC_MATCHES
+            if any(indicator in alias_name_lower or indicator in alias_desc_lower for indicator in text_indicators)
+        ]
+
         # 查找相同页面和上下文的可交互元素
         best_candidate = None
         best_score = 0
 
-        for candidate_alias in aliases:
-            candidate_role = getattr(candidate_alias, 'role', '').lower()
+        for features in alias_index.features:
+            candidate_alias = features.alias
 
             # 只考虑按钮和链接
-            interactive_roles = {'按钮', 'button', '链接', 'link'}
-            if candidate_role not in interactive_roles:
+            if features.role_lower not in INTERACTIVE_ROLES:
                 continue
 
             # 必须在同一页面
             if candidate_alias.page_id != target_page_id:
                 continue
 
-            candidate_name_lower = candidate_alias.name.lower()
-            candidate_desc_lower = (candidate_alias.description or "").lower()
+            candidate_name_lower = features.name_lower
+            candidate_desc_lower = features.desc_lower
 
             # 计算相关性分数
             score = 0
@@ -378,25 +747,17 @@ class LLMCompilationPipeline:
             score += 50
 
             # 名称相似度：检查是否包含相同的关键词
-            name_keywords = set(alias_name_lower.split('.'))
-            candidate_keywords = set(candidate_name_lower.split('.'))
-            common_keywords = name_keywords & candidate_keywords
+            common_keywords = name_keywords & features.name_segments
             score += len(common_keywords) * 30
 
             # 描述相关性：检查是否描述类似的操作（如都涉及同一商品）
-            if value and value.lower() in candidate_desc_lower:
+            if value and value_lower in candidate_desc_lower:
                 score += 40
 
-            # 语义关联：如果文本是"商品名称"，优先找"购买按钮"或"详情链接"
-            semantic_matches = {
-                ('商品', '名称', 'product', 'name'): ('buy', 'purchase', '购买', 'detail', '详情'),
-                ('标题', 'title', 'heading'): ('link', 'button', '链接', '按钮'),
-            }
-
-            for text_indicators, button_indicators in semantic_matches.items():
-                if any(indicator in alias_name_lower or indicator in alias_desc_lower for indicator in text_indicators):
-                    if any(indicator in candidate_name_lower or indicator in candidate_desc_lower for indicator in button_indicators):
-                        score += 60
+            # 语义关联
+            for button_indicators in wanted_button_indicators:
+                if any(indicator in candidate_name_lower or indicator in candidate_desc_lower for indicator in button_indicators):
+                    score += 60
 
             # 别名置信度
             if hasattr(candidate_alias, 'confidence'):
@@ -416,11 +777,12 @@ class LLMCompilationPipeline:
         return None
 
     @staticmethod
-    def _find_related_item_alias(list_alias: SiteAlias, aliases: List[SiteAlias]) -> Optional[SiteAlias]:
-        for alias in aliases:
+    def _find_related_item_alias(list_alias: SiteAlias, alias_features: List[_AliasFeatures]) -> Optional[SiteAlias]:
+        for features in alias_features:
+            alias = features.alias
             if alias is list_alias:
                 continue
-            name_lower = alias.name.lower()
+            name_lower = features.name_lower
             if "item" in name_lower and ("university" in name_lower or "result" in name_lower):
                 if list_alias.selector.rstrip(' >') in alias.selector:
                     return alias
@@ -428,248 +790,148 @@ class LLMCompilationPipeline:
 
     @staticmethod
     def _sanitize_selector(selector: str) -> str:
-
-        def replace(match: re.Match[str]) -> str:
-            text = match.group(2)
-            text = text.replace('"', '\\"')
-            return f':has-text("{text}")'
-
-        return CONTAINS_SELECTOR_PATTERN.sub(replace, selector)
+        # 绝大多数选择器不含 :contains(，直接返回，跳过正则替换
+        if ":contains(" not in selector:
+            return selector
+        return CONTAINS_SELECTOR_PATTERN.sub(_contains_to_has_text, selector)
 
     @staticmethod
     def _fallback_selector_to_profile(
         selector: str,
         step: Dict[str, object],
-        aliases: List[SiteAlias],
+        alias_index: _AliasIndex,
     ) -> Tuple[str, Optional[SiteAlias]]:
-        if not aliases:
+        alias_features = alias_index.features
+        if not alias_features:
             return selector, None
 
-        alias_by_selector = {alias.selector: alias for alias in aliases}
-        if selector in alias_by_selector:
-            return selector, alias_by_selector[selector]
+        exact_alias = alias_index.by_selector.get(selector)
+        if exact_alias is not None:
+            return selector, exact_alias
 
         lowered_selector = selector.lower()
-        for alias in aliases:
-            if alias.selector.lower() in lowered_selector:
-                return alias.selector, alias
+        for features in alias_features:
+            if features.selector_lower in lowered_selector:
+                return features.alias.selector, features.alias
 
         # 操作类型感知的别名匹配
         step_type = (step.get("t") or "").lower()
         if step_type == "click":
             # 点击操作：优先匹配按钮、链接等交互元素
-            return LLMCompilationPipeline._find_click_target_alias(selector, aliases)
+            return LLMCompilationPipeline._find_click_target_alias(selector, alias_index)
         elif step_type == "fill":
-            # 输入操作：优先匹配输入框
-            return LLMCompilationPipeline._find_input_target_alias(selector, aliases)
+            # 输入操作：选择器本身含输入关键词时第一个别名即命中，否则取第一个输入框类别名
+            if not INPUT_ALIAS_KEYWORDS.isdisjoint(_extract_tokens(selector)):
+                target = alias_features[0].alias
+            else:
+                target = alias_index.input_alias
+            return (target.selector, target) if target else (selector, None)
         elif step_type == "assert":
-            # 断言操作：优先匹配文本、标题等显示元素
-            return LLMCompilationPipeline._find_assert_target_alias(selector, aliases)
+            # 断言操作：取第一个文本、标题等显示元素类别名
+            target = alias_index.display_alias
+            return (target.selector, target) if target else (selector, None)
 
-        title_aliases = [
-            alias for alias in aliases if "title" in alias.name.lower() or "heading" in alias.name.lower() or (
-                alias.description and "标题" in alias.description) or (alias.description and "title" in alias.description.lower())
-        ]
+        title_aliases = alias_index.title_aliases
         if title_aliases and ("site-title" in lowered_selector or "page-title" in lowered_selector
                               or lowered_selector.strip() in {".site-title", "h1", "header"}):
             alias = title_aliases[0]
             return alias.selector, alias
 
         # 兼容原有的大学列表逻辑
-        if "university-list" in lowered_selector or "nav-link" in lowered_selector:
-            for alias in aliases:
-                name_lower = alias.name.lower()
-                desc_lower = (alias.description or "").lower()
-                if (("results" in name_lower and "item" in name_lower) or ("university" in name_lower and ("item" in name_lower or "list" in name_lower))
-                        or ("sidebar" in name_lower and "university" in name_lower) or ("大学" in desc_lower and ("列表" in desc_lower or "选项" in desc_lower))):
-                    return alias.selector, alias
+        if alias_index.university_aliases and ("university-list" in lowered_selector or "nav-link" in lowered_selector):
+            alias = alias_index.university_aliases[0]
+            return alias.selector, alias
 
+        # click/fill/assert 已在上方分派，这里只剩 goto 等步骤，打分只取决于 token 重合度
         best_alias: Optional[SiteAlias] = None
         best_score = 0
-        selector_tokens = LLMCompilationPipeline._extract_tokens(selector)
-        step_type = (step.get("t") or "").lower()
-
-        for alias in aliases:
-            score = 0
-            alias_selector_tokens = LLMCompilationPipeline._extract_tokens(alias.selector)
-            alias_name_tokens = LLMCompilationPipeline._extract_tokens(alias.name)
-            alias_desc_tokens = LLMCompilationPipeline._extract_tokens(alias.description)
-
-            score += 3 * len(selector_tokens & alias_selector_tokens)
-            score += 2 * len(selector_tokens & alias_name_tokens)
-            score += len(selector_tokens & alias_desc_tokens)
-
-            if step_type == "fill" and any(keyword in alias_name_tokens or keyword in alias_selector_tokens for keyword in {"input", "field", "textbox"}):
-                score += 4
-            if step_type == "click" and any(keyword in alias_name_tokens or keyword in alias_selector_tokens
-                                            for keyword in {"button", "btn", "item", "link", "list"}):
-                score += 3
-            if step_type == "assert" and step.get("kind") == "text_contains" and step.get("value"):
-                value = str(step["value"])
-                if alias.description and value in alias.description:
-                    score += 3
-                if alias.selector.lower().endswith("h1") or "title" in alias.name.lower():
-                    score += 1
-                if alias.description and any(keyword in alias.description.lower() for keyword in ("大学", "列表", "list")):
-                    score += 2
-                if any(keyword in alias.name.lower() for keyword in ("university", "results", "sidebar")):
-                    score += 2
-                if any(token in alias_name_tokens for token in {"list", "panel", "section"}):
-                    score += 2
-                if alias.description and any(keyword in alias.description for keyword in ("列表", "list", "容器")):
-                    score += 2
-                if any(token in alias_name_tokens for token in {"item", "link"}):
-                    score -= 2
+        selector_bits = alias_index.encode(_extract_tokens(selector))
 
+        for features in alias_features:
+            score = (3 * (selector_bits & features.selector_bits).bit_count() + 2 * (selector_bits & features.name_bits).bit_count() +
+                     (selector_bits & features.desc_bits).bit_count())
             if score > best_score:
                 best_score = score
-                best_alias = alias
+                best_alias = features.alias
 
         if best_alias and best_score >= 3:
             return best_alias.selector, best_alias
 
-        for alias in aliases:
-            tokens = [token for token in re.split(r"[._\-]+", alias.name.lower()) if len(token) >= 3]
+        for features in alias_features:
+            tokens = features.name_parts
             if tokens and all(token in lowered_selector for token in tokens):
-                return alias.selector, alias
-            if alias.description:
-                desc_tokens = [token for token in alias.description.lower().split() if len(token) >= 3]
-                if desc_tokens and all(token in lowered_selector for token in desc_tokens):
-                    return alias.selector, alias
+                return features.alias.selector, features.alias
+            desc_tokens = features.desc_words
+            if desc_tokens and all(token in lowered_selector for token in desc_tokens):
+                return features.alias.selector, features.alias
 
         return selector, None
 
     @staticmethod
-    def _find_click_target_alias(selector: str, aliases: List[SiteAlias]) -> Tuple[str, Optional[SiteAlias]]:
+    def _find_click_target_alias(selector: str, alias_index: _AliasIndex) -> Tuple[str, Optional[SiteAlias]]:
         """为点击操作智能匹配别名，优先匹配按钮、链接等交互元素"""
-        lowered_selector = selector.lower()
-        selector_tokens = LLMCompilationPipeline._extract_tokens(selector)
+        selector_tokens = _extract_tokens(selector)
+        selector_bits = alias_index.encode(selector_tokens)
+        interactive_mask = alias_index.interactive_mask
 
-        # 定义交互元素的关键词
-        interactive_keywords = {
-            'button', 'btn', 'buy', 'purchase', 'click', 'link', 'submit', 'confirm', '按钮', '购买', '点击', '提交', '确定', '购买按钮', 'buy_list', 'buybtn'
-        }
+        # 特殊匹配规则：商品名称文本 -> 购买按钮
+        targets_product_name = (('product' in selector_tokens or '商品' in selector_tokens or 'item' in selector_tokens)
+                                and ('name' in selector_tokens or '名称' in selector_tokens))
 
         # 优先匹配包含交互关键词的别名
         best_alias: Optional[SiteAlias] = None
         best_score = 0
 
-        for alias in aliases:
+        for features in alias_index.features:
             score = 0
-            alias_name_tokens = LLMCompilationPipeline._extract_tokens(alias.name)
-            alias_desc_tokens = LLMCompilationPipeline._extract_tokens(alias.description)
 
             # 检查是否包含交互关键词
-            interactive_matches = len(selector_tokens & interactive_keywords)
-            name_interactive_matches = len(alias_name_tokens & interactive_keywords)
-            desc_interactive_matches = len(alias_desc_tokens & interactive_keywords)
+            name_interactive_matches = (features.name_bits & interactive_mask).bit_count()
+            desc_interactive_matches = (features.desc_bits & interactive_mask).bit_count()
 
             if name_interactive_matches > 0 or desc_interactive_matches > 0:
                 score += 10 * (name_interactive_matches + desc_interactive_matches)
 
             # 检查selector相似度
-            selector_similarity = len(selector_tokens & alias_name_tokens)
+            selector_similarity = (selector_bits & features.name_bits).bit_count()
             if selector_similarity > 0:
                 score += 5 * selector_similarity
 
-            # 特殊匹配规则：商品名称文本 -> 购买按钮
-            if ('product' in selector_tokens or '商品' in selector_tokens or 'item' in selector_tokens) and ('name' in selector_tokens
-                                                                                                           or '名称' in selector_tokens):
-                if (name_interactive_matches > 0 or desc_interactive_matches > 0) and any(
-                        keyword in alias.name.lower() or keyword in (alias.description or "").lower() for keyword in ['buy', 'purchase', '购买', 'buy_list']):
+            if targets_product_name:
+                if (name_interactive_matches > 0 or desc_interactive_matches > 0) and features.is_buy:
                     score += 15  # 给予额外权重
 
             if score > best_score:
                 best_score = score
-                best_alias = alias
+                best_alias = features.alias
 
         if best_alias and best_score > 5:  # 设置最低分数阈值
             return best_alias.selector, best_alias
 
         return selector, None
 
-    @staticmethod
-    def _find_input_target_alias(selector: str, aliases: List[SiteAlias]) -> Tuple[str, Optional[SiteAlias]]:
-        """为输入操作智能匹配别名，优先匹配输入框"""
-        lowered_selector = selector.lower()
-        selector_tokens = LLMCompilationPipeline._extract_tokens(selector)
-
-        # 定义输入元素的关键词
-        input_keywords = {'input', 'field', 'textbox', 'text', 'search', 'fill', 'enter', '输入', '框', '文本框', '搜索', '填入', 'searchData', 'searchDatahead'}
-
-        for alias in aliases:
-            alias_name_tokens = LLMCompilationPipeline._extract_tokens(alias.name)
-            alias_desc_tokens = LLMCompilationPipeline._extract_tokens(alias.description)
-
-            # 检查是否包含输入关键词
-            if (alias_name_tokens & input_keywords or alias_desc_tokens & input_keywords or selector_tokens & input_keywords):
-                return alias.selector, alias
-
-        return selector, None
-
-    @staticmethod
-    def _find_assert_target_alias(selector: str, aliases: List[SiteAlias]) -> Tuple[str, Optional[SiteAlias]]:
-        """为断言操作智能匹配别名，优先匹配文本、标题等显示元素"""
-        lowered_selector = selector.lower()
-        selector_tokens = LLMCompilationPipeline._extract_tokens(selector)
-
-        # 定义显示元素的关键词
-        display_keywords = {'title', 'text', 'label', 'name', 'content', 'value', 'price', '标题', '文本', '名称', '内容', '价格', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
-
-        for alias in aliases:
-            alias_name_tokens = LLMCompilationPipeline._extract_tokens(alias.name)
-            alias_desc_tokens = LLMCompilationPipeline._extract_tokens(alias.description)
-
-            # 检查是否包含显示关键词
-            if (alias_name_tokens & display_keywords or alias_desc_tokens & display_keywords):
-                return alias.selector, alias
-
-        return selector, None
-
     def _validate_against_profile(
         self,
         result: CompilationResult,
         profile: SiteProfile,
     ) -> None:
-        disallowed_patterns = [":contains", "::", "contains(", "[text()"]
-        allowed_step_kinds = {
-            "visible",
-            "text_contains",
-            "text_equals",
-            "text_regex",
-            "invisible",
-            "count_equals",
-            "count_at_least",
-        }
         errors: List[str] = []
 
         for index, step in enumerate(result.steps, start=1):
             selector = step.selector
             step_type = step.t
             if selector:
-                if any(pattern in selector for pattern in disallowed_patterns):
+                if DISALLOWED_SELECTOR_PATTERN.search(selector):
                     errors.append(f"步骤{index} selector {selector} 使用了不支持的伪类/语法")
             if step_type == "fill" and not step.value:
                 errors.append(f"步骤{index} 缺少填充的 value 值")
-            if step.kind and step.kind not in allowed_step_kinds:
+            if step.kind and step.kind not in ALLOWED_ASSERT_KINDS:
                 errors.append(f"步骤{index} 使用了未支持的断言类型 {step.kind}")
 
         if errors:
             raise ValueError("; ".join(errors))
 
-    @staticmethod
-    def _extract_tokens(text: Optional[str]) -> Set[str]:
-        tokens: Set[str] = set()
-        if not text:
-            return tokens
-        lowered = text.lower()
-        for part in re.split(r"[^a-z0-9]+", lowered):
-            if len(part) >= 2:
-                tokens.add(part)
-        for part in re.split(r"[\s._#:\-]+", lowered):
-            if len(part) >= 2:
-                tokens.add(part)
-        return tokens
+    _extract_tokens = staticmethod(_extract_tokens)
 
 
 def run_pipeline(
@@ -683,13 +945,20 @@ def run_pipeline(
     max_attempts: int = 3,
     temperature: float = 0.2,
     api_timeout: Optional[float] = None,
+    concurrency: int = 1,
+    keep_payload: bool = False,
+    use_cache: bool = True,
+    client: Optional[LLMClient] = None,
 ) -> CompilationResult:
-    client = LLMClient(timeout=api_timeout)
+    # 未显式传入时复用按配置缓存的共享客户端；传入时 api_timeout 与 use_cache 由调用方的客户端决定
+    if client is None:
+        client = get_shared_client(api_timeout, use_cache)
     pipeline = LLMCompilationPipeline(
         client=client,
         schema_path=schema_path,
         max_attempts=max_attempts,
         temperature=temperature,
+        concurrency=concurrency,
     )
     return pipeline.run(
         request=request,
@@ -697,4 +966,5 @@ def run_pipeline(
         plan_root=plan_root,
         plan_name=plan_name,
         case_name=case_name,
+        keep_payload=keep_payload,
     )
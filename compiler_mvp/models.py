@@ -3,10 +3,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TestStep:
     """Represents a single natural-language test step."""
 
@@ -24,7 +24,7 @@ class TestRequest:
     source_path: Path
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SiteAlias:
     """Alias definition within a SiteProfile."""
 
@@ -32,6 +32,7 @@ class SiteAlias:
     selector: str
     description: Optional[str]
     page_id: str
+    role: Optional[str] = None
 
 
 @dataclass
@@ -42,7 +43,7 @@ class SiteProfile:
     raw: Dict[str, object]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CompiledStep:
     """ActionPlan step representation."""
 
@@ -52,8 +53,19 @@ class CompiledStep:
     value: Optional[str] = None
     kind: Optional[str] = None
 
+    @classmethod
+    def from_mapping(cls, step: Mapping[str, Any]) -> CompiledStep:
+        """Build a step directly from a DSL step mapping without copying it."""
+        return cls(
+            t=step["t"],
+            selector=step.get("selector"),
+            url=step.get("url"),
+            value=step.get("value"),
+            kind=step.get("kind"),
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class CompilationResult:
     """Final compiled ActionPlan data."""
 
@@ -62,9 +74,11 @@ class CompilationResult:
     steps: List[CompiledStep]
     plan_dir: Path
     case_dir: Path
+    # 仅在调用方请求时保留已写入 action_plan.json 的内容，避免再从磁盘读回
+    payload: Optional[Dict[str, object]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DataItem:
     """A single data item for data-driven compilation."""
 
@@ -81,7 +95,7 @@ class DataSet:
     raw: Dict[str, object] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlaceholderMatch:
     """Information about a matched placeholder."""
 
@@ -89,13 +103,18 @@ class PlaceholderMatch:
     field_name: str
     multiplier: Optional[int] = None
     is_gender_translation: bool = False
+    prefixed_field: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # 带 s_ 前缀的候选字段名只在构造时拼接一次
+        object.__setattr__(self, 'prefixed_field', f's_{self.field_name}')
 
     def is_expression(self) -> bool:
         """Check if this is an expression placeholder (with multiplier)."""
         return self.multiplier is not None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReplacementError:
     """Error encountered during placeholder replacement."""
 
@@ -106,7 +125,7 @@ class ReplacementError:
     message: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ReplacementStats:
     """Statistics for placeholder replacement process."""
 
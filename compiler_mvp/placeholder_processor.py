@@ -1,12 +1,19 @@
 """Placeholder detection, extraction, translation, and replacement."""
 from __future__ import annotations
 
+import functools
+import math
 import re
+from dataclasses import dataclass
+from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
 
 from .models import PlaceholderMatch, ReplacementError, ReplacementStats
 
-PLACEHOLDER_PATTERN = re.compile(r's_([a-zA-Z_][a-zA-Z0-9_]*)(?:\*(\d+))?')
+PLACEHOLDER_PATTERN = re.compile(r's_([a-zA-Z_][a-zA-Z0-9_]*)(?:\*(\d+))?', re.ASCII)
+
+# float() 接受的十进制数字写法（不含 inf/nan）；float() 不会去除 \x1c-\x1f，首尾空白需排除这几个字符
+NUMBER_PATTERN = re.compile(r'[^\S\x1c-\x1f]*[+-]?(?:\d(?:_?\d)*(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)(?:[eE][+-]?\d(?:_?\d)*)?[^\S\x1c-\x1f]*')
 
 GENDER_TRANSLATION_MAP = {
     'm': '男',
@@ -15,6 +22,46 @@ GENDER_TRANSLATION_MAP = {
 }
 
 
+@dataclass(frozen=True)
+class TemplateText:
+    """A template string split into literal segments and the placeholders between them.
+
+    ``literals`` always has one more element than ``placeholders``.
+    """
+
+    literals: Tuple[str, ...]
+    placeholders: Tuple[PlaceholderMatch, ...]
+
+
+@functools.lru_cache(maxsize=4096)
+def _make_placeholder_match(placeholder: str, field_name: str, multiplier_str: Optional[str]) -> PlaceholderMatch:
+    # 相同的占位符文本在所有模板字符串间共享同一个不可变对象
+    return PlaceholderMatch(
+        placeholder=placeholder,
+        field_name=field_name,
+        multiplier=int(multiplier_str) if multiplier_str else None,
+        is_gender_translation=field_name == 'gender',
+    )
+
+
+def _to_placeholder_match(match: re.Match[str]) -> PlaceholderMatch:
+    return _make_placeholder_match(*match.group(0, 1, 2))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_template(text: str) -> TemplateText:
+    """Parse ``text`` once; data-driven runs apply the same template strings to every data item."""
+    literals: List[str] = []
+    placeholders: List[PlaceholderMatch] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        literals.append(text[position:match.start()])
+        placeholders.append(_to_placeholder_match(match))
+        position = match.end()
+    literals.append(text[position:])
+    return TemplateText(literals=tuple(literals), placeholders=tuple(placeholders))
+
+
 class PlaceholderProcessor:
     """Handles placeholder detection, extraction, translation, and replacement."""
 
@@ -28,26 +75,10 @@ class PlaceholderProcessor:
         Returns:
             List of PlaceholderMatch objects found in the text.
         """
-        if not isinstance(text, str):
+        if not isinstance(text, str) or 's_' not in text:
             return []
 
-        matches = []
-        for match in PLACEHOLDER_PATTERN.finditer(text):
-            field_name = match.group(1)
-            multiplier_str = match.group(2)
-            multiplier = int(multiplier_str) if multiplier_str else None
-            full_placeholder = match.group(0)
-
-            is_gender = field_name == 'gender'
-
-            matches.append(PlaceholderMatch(
-                placeholder=full_placeholder,
-                field_name=field_name,
-                multiplier=multiplier,
-                is_gender_translation=is_gender,
-            ))
-
-        return matches
+        return list(_parse_template(text).placeholders)
 
     @staticmethod
     def extract_unique_fields(placeholders: List[PlaceholderMatch]) -> Dict[str, List[PlaceholderMatch]]:
@@ -61,30 +92,23 @@ class PlaceholderProcessor:
         """
         fields: Dict[str, List[PlaceholderMatch]] = {}
         for placeholder in placeholders:
-            if placeholder.field_name not in fields:
-                fields[placeholder.field_name] = []
-            fields[placeholder.field_name].append(placeholder)
+            fields.setdefault(placeholder.field_name, []).append(placeholder)
         return fields
 
     @staticmethod
-    def translate_gender(value: str) -> str:
+    def translate_gender(value: str) -> Optional[str]:
         """Translate gender value.
 
         Args:
             value: The gender value ('m', 'f', or 'm,f').
 
         Returns:
-            Translated gender string.
-
-        Raises:
-            ValueError: If the gender value is not recognized.
+            Translated gender string, or None if the gender value is not recognized.
         """
-        if value not in GENDER_TRANSLATION_MAP:
-            raise ValueError(f'未知的性别值: {value}')
-        return GENDER_TRANSLATION_MAP[value]
+        return GENDER_TRANSLATION_MAP.get(value)
 
     @staticmethod
-    def apply_expression(base_value: str, multiplier: int) -> str:
+    def apply_expression(base_value: str, multiplier: int) -> Optional[str]:
         """Apply expression (multiplication) to a value.
 
         Args:
@@ -92,19 +116,24 @@ class PlaceholderProcessor:
             multiplier: The multiplier to apply.
 
         Returns:
-            The result as a string.
-
-        Raises:
-            ValueError: If base_value is not numeric.
+            The result as a string, or None if base_value is not a finite number.
         """
-        try:
-            num = float(base_value)
-            result = num * multiplier
-            if result == int(result):
-                return str(int(result))
-            return str(result)
-        except ValueError as e:
-            raise ValueError(f'无法计算表达式: {base_value} * {multiplier}') from e
+        # 常见的整数价格直接按整数相乘
+        digits = base_value[1:] if base_value.startswith('-') else base_value
+        if digits.isdecimal() and len(digits) <= 18:
+            return str(int(base_value) * multiplier)
+
+        # 先用正则判定是否为数字，非法数据不再经过异常路径；小数用 Decimal 计算避免浮点误差
+        if NUMBER_PATTERN.fullmatch(base_value) is None:
+            return None
+        number = Decimal(base_value)
+        # 超出浮点范围的结果仍视为计算失败
+        if not math.isfinite(float(number) * multiplier):
+            return None
+        result = number * multiplier
+        if result == result.to_integral_value():
+            return str(int(result))
+        return format(result, 'f').rstrip('0')
 
     @staticmethod
     def get_replacement_value(
@@ -125,26 +154,16 @@ class PlaceholderProcessor:
             The replacement value, or None if there's an error.
         """
         # 尝试不带 s_ 前缀的字段名，然后尝试带 s_ 前缀的
-        field_candidates = [
-            placeholder.field_name,
-            f's_{placeholder.field_name}',
-        ]
-
-        field_value = None
-        actual_field = None
-        for field in field_candidates:
-            if field in data:
-                field_value = data[field]
-                actual_field = field
-                break
+        field_name = placeholder.field_name
+        field_value = data[field_name] if field_name in data else data.get(placeholder.prefixed_field)
 
         if field_value is None:
             error = ReplacementError(
                 error_type='missing_field',
                 placeholder=placeholder.placeholder,
-                field_name=placeholder.field_name,
+                field_name=field_name,
                 data_index=data_index,
-                message=f'数据项中缺失字段: {placeholder.field_name} (尝试过: {", ".join(field_candidates)})',
+                message=f'数据项中缺失字段: {field_name} (尝试过: {field_name}, {placeholder.prefixed_field})',
             )
             stats.errors.append(error)
             return None
@@ -154,32 +173,30 @@ class PlaceholderProcessor:
             base_value = str(base_value)
 
         if placeholder.is_gender_translation:
-            try:
-                return PlaceholderProcessor.translate_gender(base_value)
-            except ValueError as e:
+            translated = PlaceholderProcessor.translate_gender(base_value)
+            if translated is None:
                 error = ReplacementError(
                     error_type='translation_error',
                     placeholder=placeholder.placeholder,
                     field_name=placeholder.field_name,
                     data_index=data_index,
-                    message=str(e),
+                    message=f'未知的性别值: {base_value}',
                 )
                 stats.errors.append(error)
-                return None
+            return translated
 
         if placeholder.is_expression():
-            try:
-                return PlaceholderProcessor.apply_expression(base_value, placeholder.multiplier)
-            except ValueError as e:
+            computed = PlaceholderProcessor.apply_expression(base_value, placeholder.multiplier)
+            if computed is None:
                 error = ReplacementError(
                     error_type='expression_error',
                     placeholder=placeholder.placeholder,
                     field_name=placeholder.field_name,
                     data_index=data_index,
-                    message=str(e),
+                    message=f'无法计算表达式: {base_value} * {placeholder.multiplier}',
                 )
                 stats.errors.append(error)
-                return None
+            return computed
 
         return base_value
 
@@ -202,38 +219,135 @@ class PlaceholderProcessor:
             Tuple of (replaced_text, success_flag).
             success_flag indicates if all replacements succeeded.
         """
-        if not isinstance(text, str):
+        # 大多数选择器、URL 不含占位符，先用子串判断跳过正则与解析缓存
+        if not isinstance(text, str) or 's_' not in text:
             return text, True
 
-        result = text
-        placeholders = PlaceholderProcessor.find_all_placeholders(text)
-
-        if not placeholders:
-            return result, True
+        template = _parse_template(text)
+        if not template.placeholders:
+            return text, True
+        return PlaceholderProcessor._render(template, data, stats, data_index)
 
-        all_success = True
-        for placeholder in placeholders:
-            replacement = PlaceholderProcessor.get_replacement_value(placeholder, data, stats, data_index)
+    @staticmethod
+    def _render(
+        template: TemplateText,
+        data: Dict[str, Any],
+        stats: ReplacementStats,
+        data_index: int,
+    ) -> Tuple[str, bool]:
+        # 按解析结果逐段拼接：每个占位符只替换一次，替换值中形如 s_xxx 的文本不会被再次替换或误报
+        failed: List[PlaceholderMatch] = []
+        literals = template.literals
+        parts = [literals[0]]
+        append = parts.append
+        for placeholder, literal in zip(template.placeholders, literals[1:]):
+            # 成功路径内联取值与转换，与 get_replacement_value 的规则一致
+            field_name = placeholder.field_name
+            replacement = data[field_name] if field_name in data else data.get(placeholder.prefixed_field)
+            if replacement is not None:
+                if not isinstance(replacement, str):
+                    replacement = str(replacement)
+                if placeholder.is_gender_translation:
+                    replacement = GENDER_TRANSLATION_MAP.get(replacement)
+                elif placeholder.multiplier is not None:
+                    replacement = PlaceholderProcessor.apply_expression(replacement, placeholder.multiplier)
 
             if replacement is None:
-                all_success = False
-            else:
-                result = result.replace(placeholder.placeholder, replacement)
+                # 失败路径交给 get_replacement_value 记录具体错误
+                PlaceholderProcessor.get_replacement_value(placeholder, data, stats, data_index)
+                failed.append(placeholder)
+                replacement = placeholder.placeholder
+            append(replacement)
+            append(literal)
+
+        errors_append = stats.errors.append
+        for placeholder in failed:
+            error = ReplacementError(
+                error_type='unreplaced_placeholder',
+                placeholder=placeholder.placeholder,
+                field_name=placeholder.field_name,
+                data_index=data_index,
+                message=f'替换后仍存在无法处理的占位符: {placeholder.placeholder}',
+            )
+            errors_append(error)
 
-        remaining_placeholders = PlaceholderProcessor.find_all_placeholders(result)
-        if remaining_placeholders:
-            for p in remaining_placeholders:
-                error = ReplacementError(
-                    error_type='unreplaced_placeholder',
-                    placeholder=p.placeholder,
-                    field_name=p.field_name,
-                    data_index=data_index,
-                    message=f'替换后仍存在无法处理的占位符: {p.placeholder}',
-                )
-                stats.errors.append(error)
-            all_success = False
+        return ''.join(parts), not failed
+
+    @staticmethod
+    def compile_template(obj: Any) -> Any:
+        """Pre-parse every string of a template once, for repeated use with ``apply_template``.
+
+        Args:
+            obj: The template object (dict, list, string, or other JSON value).
 
-        return result, all_success
+        Returns:
+            The same structure with placeholder-bearing strings replaced by ``TemplateText``.
+        """
+        if isinstance(obj, dict):
+            return {key: PlaceholderProcessor.compile_template(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [PlaceholderProcessor.compile_template(item) for item in obj]
+        if isinstance(obj, str) and 's_' in obj:
+            template = _parse_template(obj)
+            return template if template.placeholders else obj
+        return obj
+
+    @staticmethod
+    def apply_template(
+        compiled: Any,
+        data: Dict[str, Any],
+        stats: ReplacementStats,
+        data_index: int,
+    ) -> Tuple[Any, bool]:
+        """Build one data item's object from a template prepared by ``compile_template``.
+
+        Args:
+            compiled: The result of ``compile_template``.
+            data: The data dictionary.
+            stats: ReplacementStats to record errors and successes.
+            data_index: Index of the data item (for error reporting).
+
+        Returns:
+            Tuple of (new_object, success_flag); the compiled template is not modified.
+        """
+        if isinstance(compiled, TemplateText):
+            return PlaceholderProcessor._render(compiled, data, stats, data_index)
+        if not isinstance(compiled, (dict, list)):
+            return compiled, True
+
+        render = PlaceholderProcessor._render
+        all_success = True
+        root = {} if isinstance(compiled, dict) else []
+        # 显式栈代替递归：栈元素为（源容器的迭代器, 目标容器），深度优先按原顺序处理，错误记录顺序不变
+        stack = [(iter(compiled.items() if isinstance(compiled, dict) else compiled), root)]
+        while stack:
+            children, target = stack[-1]
+            is_dict = isinstance(target, dict)
+            for entry in children:
+                key, value = entry if is_dict else (None, entry)
+                source = None
+                if isinstance(value, TemplateText):
+                    value, success = render(value, data, stats, data_index)
+                    if not success:
+                        all_success = False
+                elif isinstance(value, dict):
+                    source, value = iter(value.items()), {}
+                elif isinstance(value, list):
+                    source, value = iter(value), []
+
+                if is_dict:
+                    target[key] = value
+                else:
+                    target.append(value)
+
+                if source is not None:
+                    # 先处理子容器，本层迭代器留在栈中稍后继续
+                    stack.append((source, value))
+                    break
+            else:
+                stack.pop()
+
+        return root, all_success
 
     @staticmethod
     def replace_placeholders_in_dict(
@@ -242,7 +356,7 @@ class PlaceholderProcessor:
         stats: ReplacementStats,
         data_index: int,
     ) -> Tuple[Any, bool]:
-        """Recursively replace placeholders in a dictionary/list/string.
+        """Replace placeholders in a dictionary/list/string.
 
         Args:
             obj: The object to process (can be dict, list, string, or other).
@@ -253,25 +367,5 @@ class PlaceholderProcessor:
         Returns:
             Tuple of (processed_object, success_flag).
         """
-        if isinstance(obj, dict):
-            result = {}
-            all_success = True
-            for key, value in obj.items():
-                processed, success = PlaceholderProcessor.replace_placeholders_in_dict(value, data, stats, data_index)
-                result[key] = processed
-                all_success = all_success and success
-            return result, all_success
-
-        if isinstance(obj, list):
-            result = []
-            all_success = True
-            for item in obj:
-                processed, success = PlaceholderProcessor.replace_placeholders_in_dict(item, data, stats, data_index)
-                result.append(processed)
-                all_success = all_success and success
-            return result, all_success
-
-        if isinstance(obj, str):
-            return PlaceholderProcessor.replace_placeholders_in_text(obj, data, stats, data_index)
-
-        return obj, True
+        compiled = PlaceholderProcessor.compile_template(obj)
+        return PlaceholderProcessor.apply_template(compiled, data, stats, data_index)
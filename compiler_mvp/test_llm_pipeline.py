@@ -0,0 +1,125 @@
+"""Quick test script for LLM pipeline helper functions."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from jsonschema import ValidationError
+
+from .llm_pipeline import LLMCompilationPipeline, extract_json_block
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "dsl" / "action_plan.schema.json"
+
+
+def test_extract_fenced_json():
+    """Test extraction from a fenced code block."""
+    print("测试 1: 代码块中的 JSON 提取")
+    text = '说明 {注意}\n```json\n{"meta": {"testId": "A"}, "steps": [{"t": "goto", "url": "/"}]}\n```\n结束 }'
+    block = extract_json_block(text)
+    print(f"  提取结果: {block}")
+    assert json.loads(block)["meta"]["testId"] == "A"
+    print("  ✓ 通过\n")
+
+
+def test_extract_braces_inside_strings():
+    """Test that braces and escaped quotes inside strings do not break matching."""
+    print("测试 2: 字符串内的括号与转义引号")
+    text = '{"selector": ".card:has-text(\\"}{\\")", "value": "a}b"} 以及其他 {内容}'
+    block = extract_json_block(text)
+    print(f"  提取结果: {block}")
+    assert json.loads(block) == {"selector": '.card:has-text("}{")', "value": "a}b"}
+    print("  ✓ 通过\n")
+
+
+def test_extract_unbalanced_fallback():
+    """Test fallback to the first/last brace span when braces are unbalanced."""
+    print("测试 3: 括号不配对时回退")
+    text = '前缀 {"a": {"b": 1} 后缀'
+    assert extract_json_block(text) == '{"a": {"b": 1}'
+    try:
+        extract_json_block("没有 JSON")
+    except ValueError:
+        print("  ✓ 通过\n")
+    else:
+        raise AssertionError("无 JSON 时应抛出 ValueError")
+
+
+def test_revalidate_changed_steps_only():
+    """Test that correction rounds still catch errors outside the previously failed step."""
+    print("测试 4: 修正轮次的增量校验")
+    pipeline = LLMCompilationPipeline(client=None, schema_path=SCHEMA_PATH)
+    goto = {"t": "goto", "url": "/"}
+    payload = {"meta": {"testId": "A", "baseUrl": "https://example.com"}, "steps": [goto, {"t": "click"}]}
+    try:
+        pipeline._validate_payload(payload)
+    except ValidationError as exc:
+        print(f"  首轮错误: {exc.message}")
+    else:
+        raise AssertionError("缺少 selector 的 click 应校验失败")
+    assert pipeline._validated_steps == {0: goto}
+
+    fixed = {"meta": {"testId": "A", "baseUrl": "https://example.com"}, "steps": [dict(goto), {"t": "click", "selector": "#go"}]}
+    pipeline._validate_payload(fixed)
+
+    broken_meta = {"meta": {"testId": ""}, "steps": [dict(goto), {"t": "click", "selector": "#go"}]}
+    broken_step = {"meta": {"testId": "A", "baseUrl": "https://example.com"}, "steps": [{"t": "goto"}, {"t": "click", "selector": "#go"}]}
+    for candidate in (broken_meta, broken_step):
+        pipeline._validated_steps = {0: goto}
+        try:
+            pipeline._validate_payload(candidate)
+        except ValidationError:
+            continue
+        raise AssertionError(f"应校验失败: {candidate}")
+    print("  ✓ 通过\n")
+
+
+def test_extract_tokens():
+    """Test that selector tokens include both separator-split and alphanumeric pieces."""
+    print("测试 5: 选择器分词")
+    tokens = LLMCompilationPipeline._extract_tokens("UL.result-list>li.Item_Name")
+    print(f"  分词结果: {sorted(tokens)}")
+    assert tokens == {"ul", "result", "list>li", "list", "li", "item", "name"}
+    assert LLMCompilationPipeline._extract_tokens('.card:has-text("商品")') == {"card", "has", "text", 'text("商品")'}
+    assert LLMCompilationPipeline._extract_tokens(None) == set()
+    print("  ✓ 通过\n")
+
+
+def test_append_has_text_escaping():
+    """Test that quotes and backslashes in values are escaped inside :has-text()."""
+    print("测试 6: :has-text() 文案转义")
+    selector = LLMCompilationPipeline._append_has_text(".item", 'a"b\\c')
+    print(f"  生成结果: {selector}")
+    assert selector == '.item:has-text("a\\"b\\\\c")'
+    assert LLMCompilationPipeline._append_has_text('.item:has-text("x")', "y") == '.item:has-text("x")'
+    print("  ✓ 通过\n")
+
+
+def test_retry_messages_bounded():
+    """Test that retry messages keep the fixed prefix plus only the latest reply and correction."""
+    print("测试 7: 重试消息长度固定")
+    base = [{"role": "system", "content": "s"}, {"role": "user", "content": "spec"}, {"role": "user", "content": "scenario"}]
+    first = LLMCompilationPipeline._retry_messages(base, "回复1", "错误1")
+    second = LLMCompilationPipeline._retry_messages(base, "回复2", "错误2")
+    assert len(first) == len(second) == 5
+    assert second[:3] == base
+    assert second[3] == {"role": "assistant", "content": "回复2"}
+    assert "错误2" in second[4]["content"] and "错误1" not in second[4]["content"]
+    print("  ✓ 通过\n")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("LLM 编译流水线辅助函数测试")
+    print("=" * 60 + "\n")
+
+    test_extract_fenced_json()
+    test_extract_braces_inside_strings()
+    test_extract_unbalanced_fallback()
+    test_revalidate_changed_steps_only()
+    test_extract_tokens()
+    test_append_has_text_escaping()
+    test_retry_messages_bounded()
+
+    print("=" * 60)
+    print("所有测试通过！✓")
+    print("=" * 60)
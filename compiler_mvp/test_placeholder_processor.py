@@ -48,6 +48,8 @@ def test_expression():
         ('550', 2, '1100'),
         ('650', 3, '1950'),
         ('100.5', 2, '201'),
+        ('19.99', 3, '59.97'),
+        ('0.1', 3, '0.3'),
     ]
 
     for base, mult, expected in test_cases:
@@ -78,11 +80,8 @@ def test_text_replacement():
     print(f"  输出: {result}")
     print(f"  期望: {expected}")
     print(f"  成功: {success}")
-    
-    if result != expected:
-        print(f"  实际输出: {result}")
-        print(f"  问题：表达式替换需要按照特定顺序处理")
-    
+
+    assert result == expected, "s_price 不应影响 s_price*2 的替换"
     assert success, "替换应成功"
     print("  ✓ 通过\n")
 
@@ -152,6 +151,72 @@ def test_error_handling():
     print("  ✓ 通过\n")
 
 
+def test_single_pass_replacement():
+    """Test that replacement values and overlapping names are not re-replaced."""
+    print("测试 7: 单次扫描替换")
+    text = 's_name / s_name_full / s_code'
+    data = {
+        'name': 'glass_bottle',
+        'name_full': '完整名称',
+        'code': 's_name',
+    }
+    stats = ReplacementStats()
+
+    result, success = PlaceholderProcessor.replace_placeholders_in_text(
+        text, data, stats, 0
+    )
+
+    print(f"  输入: {text}")
+    print(f"  输出: {result}")
+    assert result == 'glass_bottle / 完整名称 / s_name'
+    assert success and not stats.errors, "替换值中的 s_ 文本不应被当作占位符"
+
+    stats = ReplacementStats()
+    result, success = PlaceholderProcessor.replace_placeholders_in_text(
+        's_missing-s_name', data, stats, 0
+    )
+    assert result == 's_missing-glass_bottle'
+    assert not success
+    assert [error.error_type for error in stats.errors] == ['missing_field', 'unreplaced_placeholder']
+    print("  ✓ 通过\n")
+
+
+def test_compiled_template():
+    """Test that a compiled template is reused across data items without being modified."""
+    print("测试 8: 预编译模板")
+    template = {
+        'meta': {'testId': 'T_s_code'},
+        'steps': [
+            {'t': 'fill', 'selector': '#qty', 'value': 's_qty*2'},
+            {'t': 'assert', 'kind': 'visible', 'selector': '.item'},
+        ],
+    }
+    compiled = PlaceholderProcessor.compile_template(template)
+
+    results = []
+    for index, data in enumerate([{'code': 'a1', 'qty': '3'}, {'code': 'b2', 'qty': '5'}]):
+        stats = ReplacementStats()
+        result, success = PlaceholderProcessor.apply_template(
+            compiled, data, stats, index
+        )
+        assert success and not stats.errors
+        results.append(result)
+
+    print(f"  输出: {results}")
+    assert results[0]['meta']['testId'] == 'T_a1'
+    assert results[1]['steps'][0]['value'] == '10'
+    assert results[0]['steps'] is not results[1]['steps'], "每个数据项应得到独立的对象"
+    assert results[0]['steps'][1] == template['steps'][1]
+
+    stats = ReplacementStats()
+    _, success = PlaceholderProcessor.apply_template(
+        compiled, {'qty': '1'}, stats, 2
+    )
+    assert not success
+    assert [error.field_name for error in stats.errors] == ['code', 'code']
+    print("  ✓ 通过\n")
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("占位符处理器功能测试")
@@ -163,6 +228,8 @@ if __name__ == '__main__':
     test_text_replacement()
     test_dict_replacement()
     test_error_handling()
+    test_single_pass_replacement()
+    test_compiled_template()
 
     print("=" * 60)
     print("所有测试通过！✓")
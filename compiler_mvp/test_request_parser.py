@@ -16,8 +16,15 @@ def parse_markdown(path: Path) -> TestRequest:
     lines = text.splitlines()
 
     title = ""
+    base_url = None
     steps: List[TestStep] = []
     for line in lines:
+        # URL 不会跨行，在逐行遍历中取第一个即可，不再对全文做第二次扫描
+        if base_url is None and "://" in line:
+            base_url_match = URL_PATTERN.search(line)
+            if base_url_match:
+                base_url = base_url_match.group(0)
+
         if not title and line.startswith("#"):
             title = line.lstrip("# ").strip()
             continue
@@ -31,7 +38,4 @@ def parse_markdown(path: Path) -> TestRequest:
     if not title:
         title = path.stem
 
-    base_url_match = URL_PATTERN.search(text)
-    base_url = base_url_match.group(0) if base_url_match else None
-
     return TestRequest(title=title, base_url=base_url, steps=steps, source_path=path)
@@ -4,6 +4,7 @@ from __future__ import annotations
 import json
 import logging
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -11,7 +12,7 @@ from typing import List, Optional
 
 from .executor import Executor, ExecutorSettings
 from .loader import load_action_plan
-from .models import ActionPlan, RunResult
+from .models import RunResult
 from .simple_report_generator import SimpleReportGenerator
 
 # pylint: disable=too-many-instance-attributes
@@ -34,6 +35,36 @@ class BatchResult:
     artifacts_dir: Optional[str] = None
 
 
+def _run_case_worker(case_path: Path, batch_dir: Path, case_name: str, settings: ExecutorSettings) -> RunResult:
+    """Load and run a single case; module-level so process pool workers can pickle it.
+
+    Args:
+        case_path: Case directory containing action_plan.json, or the JSON file itself.
+        batch_dir: Batch artifacts directory.
+        case_name: Case name for organization.
+        settings: Batch executor settings.
+
+    Returns:
+        RunResult for this case.
+    """
+    plan_path = case_path if case_path.is_file() else case_path / "action_plan.json"
+    plan = load_action_plan(plan_path)
+
+    temp_settings = ExecutorSettings(
+        headless=settings.headless,
+        default_timeout_ms=settings.default_timeout_ms,
+        output_root=batch_dir.parent,
+        screenshots=settings.screenshots,
+        generate_report=False,
+    )
+
+    # 直接指定case子目录作为artifacts_dir
+    case_output_dir = batch_dir / case_name
+
+    case_executor = Executor(settings=temp_settings)
+    return case_executor.run(plan, artifacts_dir=case_output_dir)
+
+
 class BatchExecutor:
     """Executes multiple test cases in batch."""
 
@@ -122,30 +153,20 @@ class BatchExecutor:
 
         self.logger.info("开始批量执行 %d 个测试用例", result.total_cases)
 
-        for i, (case_name, case_path) in enumerate(case_items, 1):
-            self.logger.info("[%d/%d] 运行: %s", i, result.total_cases, case_name)
-
-            try:
-                if case_path.is_file():
-                    plan = load_action_plan(case_path)
-                else:
-                    plan = load_action_plan(case_path / "action_plan.json")
-
-                case_result = self._run_single_case(plan, batch_dir, case_name)
-
-                result.case_results.append(case_result)
-
-                if case_result.status == "passed":
-                    result.passed_cases += 1
-                elif case_result.status == "failed":
-                    result.failed_cases += 1
-                else:
+        if self.settings.max_workers > 1 and len(case_items) > 1:
+            self._run_cases_in_pool(case_items, batch_dir, result)
+        else:
+            for i, (case_name, case_path) in enumerate(case_items, 1):
+                self.logger.info("[%d/%d] 运行: %s", i, result.total_cases, case_name)
+
+                try:
+                    case_result = _run_case_worker(case_path, batch_dir, case_name, self.settings)
+                    result.case_results.append(case_result)
+                    self._count_case_result(result, case_result)
+                except Exception as exc:
+                    self.logger.error("测试用例 %s 执行异常: %s", case_name, exc)
                     result.error_cases += 1
 
-            except Exception as exc:
-                self.logger.error("测试用例 %s 执行异常: %s", case_name, exc)
-                result.error_cases += 1
-
         result.finished_at = datetime.utcnow()
 
         self._write_batch_summary(result, batch_dir)
@@ -162,32 +183,48 @@ class BatchExecutor:
 
         return result
 
-    def _run_single_case(self, plan: ActionPlan, batch_dir: Path, case_name: str) -> RunResult:
-        """Run a single test case within batch execution.
+    def _run_cases_in_pool(self, case_items: List[tuple[str, Path]], batch_dir: Path, result: BatchResult) -> None:
+        """Run cases in parallel worker processes, each with its own browser.
 
         Args:
-            plan: The action plan to execute.
+            case_items: Case (name, path) tuples to run.
             batch_dir: Batch artifacts directory.
-            case_name: Case name for organization.
-
-        Returns:
-            RunResult for this case.
+            result: BatchResult to update; counters are updated here as cases finish.
         """
-        temp_settings = ExecutorSettings(
-            headless=self.settings.headless,
-            default_timeout_ms=self.settings.default_timeout_ms,
-            output_root=batch_dir.parent,
-            screenshots=self.settings.screenshots,
-            generate_report=False,
-        )
+        workers = min(self.settings.max_workers, len(case_items))
+        self.logger.info("使用 %d 个并行进程执行", workers)
+
+        ordered_results: List[Optional[RunResult]] = [None] * len(case_items)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_case_worker, case_path, batch_dir, case_name, self.settings): (i, case_name)
+                for i, (case_name, case_path) in enumerate(case_items)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i, case_name = futures[future]
+                try:
+                    case_result = future.result()
+                except Exception as exc:
+                    self.logger.error("测试用例 %s 执行异常: %s", case_name, exc)
+                    result.error_cases += 1
+                    continue
 
-        # 直接指定case子目录作为artifacts_dir
-        case_output_dir = batch_dir / case_name
+                self.logger.info("[%d/%d] 完成: %s (%s)", done, result.total_cases, case_name, case_result.status)
+                ordered_results[i] = case_result
+                self._count_case_result(result, case_result)
 
-        case_executor = Executor(settings=temp_settings)
-        result = case_executor.run(plan, artifacts_dir=case_output_dir)
+        # 按用例顺序汇总，摘要与报告的顺序与串行执行一致
+        result.case_results.extend(r for r in ordered_results if r is not None)
 
-        return result
+    @staticmethod
+    def _count_case_result(result: BatchResult, case_result: RunResult) -> None:
+        """Update batch counters with a finished case."""
+        if case_result.status == "passed":
+            result.passed_cases += 1
+        elif case_result.status == "failed":
+            result.failed_cases += 1
+        else:
+            result.error_cases += 1
 
     @staticmethod
     def _build_batch_id() -> str:
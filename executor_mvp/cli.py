@@ -7,7 +7,7 @@ import logging
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Sequence
+from typing import TYPE_CHECKING, Sequence
 
 try:
     from dotenv import load_dotenv
@@ -17,9 +17,8 @@ except ImportError:
         return False
 
 
-from .batch_executor import BatchExecutor
-from .executor import Executor, ExecutorSettings
-from .loader import load_plan_from_directory
+if TYPE_CHECKING:
+    from .executor import ExecutorSettings
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -43,6 +42,12 @@ def build_parser() -> argparse.ArgumentParser:
         type=int,
         help="Random seed for case selection in batch mode (for reproducibility)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of parallel worker processes in batch mode (default: 1)",
+    )
     parser.add_argument(
         "--output",
         default="results",
@@ -85,12 +90,16 @@ def main(argv: Sequence[str] | None = None) -> int:
 
     logging.basicConfig(level=logging.INFO)
 
+    # Playwright 与 LLM 客户端较重，解析参数后再导入，--help 与参数错误无需加载
+    from .executor import Executor, ExecutorSettings
+
     settings = ExecutorSettings(
         headless=not args.headed,
         default_timeout_ms=args.timeout,
         output_root=Path(args.output),
         screenshots=args.screenshots,
         generate_report=not args.no_report,
+        max_workers=max(1, args.workers),
     )
 
     # 批量执行模式
@@ -98,6 +107,7 @@ def main(argv: Sequence[str] | None = None) -> int:
         return _run_batch_mode(args, settings)
 
     # 单个用例执行模式（也使用统一的结果目录结构）
+    from .loader import load_plan_from_directory
     from .simple_report_generator import SimpleReportGenerator
 
     executor = Executor(settings=settings)
@@ -158,6 +168,8 @@ def main(argv: Sequence[str] | None = None) -> int:
 
 def _run_batch_mode(args, settings: ExecutorSettings) -> int:
     """Execute batch mode."""
+    from .batch_executor import BatchExecutor
+
     batch_executor = BatchExecutor(settings=settings)
 
     case_count = args.batch if args.batch > 0 else None
@@ -171,6 +183,8 @@ def _run_batch_mode(args, settings: ExecutorSettings) -> int:
         print("执行: 所有测试用例")
     if args.random_seed is not None:
         print(f"随机种子: {args.random_seed}")
+    if settings.max_workers > 1:
+        print(f"并行进程: {settings.max_workers}")
     print("")
 
     try:
@@ -14,7 +14,6 @@ from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
 from .models import ActionPlan, ActionStep, RunResult, StepResult
-from .report_generator import TestReportGenerator
 
 
 @dataclass
@@ -27,6 +26,7 @@ class ExecutorSettings:
     output_root: Path = Path("results")
     screenshots: str = "on-failure"  # values: none | on-failure | all
     generate_report: bool = True  # Enable LLM-powered test report generation
+    max_workers: int = 1  # Parallel worker processes for batch runs
 
 
 class Executor:
@@ -36,7 +36,11 @@ class Executor:
         self.settings = settings or ExecutorSettings()
         self.logger = logging.getLogger("executor_mvp")
         self.logger.setLevel(logging.INFO)
-        self.report_generator = TestReportGenerator() if self.settings.generate_report else None
+        self.report_generator = None
+        if self.settings.generate_report:
+            # 报告生成器依赖 LLM 客户端，仅在启用时导入（批量执行的用例进程不需要）
+            from .report_generator import TestReportGenerator
+            self.report_generator = TestReportGenerator()
 
     def run(self, plan: ActionPlan, artifacts_dir: Optional[Path] = None) -> RunResult:
         """执行测试计划
@@ -50,7 +54,7 @@ class Executor:
         """
         run_id = self._build_run_id(plan.test_id)
         if artifacts_dir is None:
-        artifacts_dir = self._prepare_artifacts(run_id)
+            artifacts_dir = self._prepare_artifacts(run_id)
         else:
             artifacts_dir.mkdir(parents=True, exist_ok=True)
         log_handler = self._attach_run_logger(artifacts_dir / "runner.log")
@@ -156,16 +160,16 @@ class Executor:
                             self.logger.error("Screenshot capture failed: %s", screenshot_exc)
                             screenshot_path = None
             else:
-            status = "failed"
-            error_message = self._format_error(exc)
-            self.logger.warning("Step %s failed: %s", index, error_message)
-            if self._should_capture(step_success=False):
-                screenshot_path = str(screenshots_dir / f"{index:02d}.png")
-                try:
-                    page.screenshot(path=screenshot_path, full_page=True)
-                except Exception as screenshot_exc:  # pragma: no cover - best effort
-                    self.logger.error("Screenshot capture failed: %s", screenshot_exc)
-                    screenshot_path = None
+                status = "failed"
+                error_message = self._format_error(exc)
+                self.logger.warning("Step %s failed: %s", index, error_message)
+                if self._should_capture(step_success=False):
+                    screenshot_path = str(screenshots_dir / f"{index:02d}.png")
+                    try:
+                        page.screenshot(path=screenshot_path, full_page=True)
+                    except Exception as screenshot_exc:  # pragma: no cover - best effort
+                        self.logger.error("Screenshot capture failed: %s", screenshot_exc)
+                        screenshot_path = None
         else:
             if self._should_capture(step_success=True):
                 screenshot_path = str(screenshots_dir / f"{index:02d}.png")